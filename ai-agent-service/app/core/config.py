@@ -11,6 +11,8 @@ class Settings(BaseSettings):
     # GitHub settings
     GITHUB_TOKEN: str = os.getenv("GITHUB_TOKEN", "")
     GITHUB_REPO: str = os.getenv("GITHUB_REPO", "your-username/your-repo")
+    # Upper bound on commit list pages followed to reach the fetch watermark
+    GITHUB_MAX_PAGES: int = int(os.getenv("GITHUB_MAX_PAGES", "20"))
     
     # Application settings
     APP_NAME: str = "GitHub Commit Tracker AI Agent"
@@ -20,6 +22,10 @@ class Settings(BaseSettings):
     # AI settings
     AI_CHECK_INTERVAL: int = int(os.getenv("AI_CHECK_INTERVAL", "300"))  # 5 minutes
     AI_CONFIDENCE_THRESHOLD: float = float(os.getenv("AI_CONFIDENCE_THRESHOLD", "0.7"))
+    # Match keywords only at the start of a word ("prefix" no longer matches "fix")
+    KEYWORD_WORD_BOUNDARY: bool = os.getenv("KEYWORD_WORD_BOUNDARY", "False").lower() == "true"
+    # Sentiment engine: "textblob" (pattern analyzer) or "lexicon" (vectorized table lookup)
+    SENTIMENT_ENGINE: str = os.getenv("SENTIMENT_ENGINE", "textblob").lower()
     
     # File settings
     JSON_FILE_PATH: str = "/app/data/commit.json"
@@ -6,6 +6,12 @@ from app.core.config import settings
 # Database connection pool
 db_pool: Optional[asyncpg.Pool] = None
 
+# Idempotent upgrades applied at startup to databases created from older init.sql
+SCHEMA_UPGRADES = [
+    "ALTER TABLE track_project.tracking_config ADD COLUMN IF NOT EXISTS last_commit_sha VARCHAR(255)",
+    "ALTER TABLE track_project.tracking_config ADD COLUMN IF NOT EXISTS last_commit_at TIMESTAMP",
+]
+
 async def init_db():
     """Initialize database connection pool"""
     global db_pool
@@ -17,6 +23,10 @@ async def init_db():
             max_size=20
         )
         print("Database connection pool created successfully")
+        
+        async with db_pool.acquire() as conn:
+            for statement in SCHEMA_UPGRADES:
+                await conn.execute(statement)
     except Exception as e:
         print(f"Error creating database pool: {e}")
         raise
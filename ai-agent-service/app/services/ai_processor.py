@@ -1,8 +1,12 @@
 from textblob import TextBlob
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Set
 from datetime import datetime
 
+from app.core.config import settings
+from app.utils.keyword_matcher import KeywordMatcher
+from app.utils.sentiment_lexicon import SentimentLexicon
+
 class AIProcessor:
     def __init__(self):
         self.categories = {
@@ -13,19 +17,33 @@ class AIProcessor:
             "security": ["security", "vulnerability", "auth", "password"],
             "performance": ["performance", "speed", "fast", "slow", "optimize"]
         }
+        self.high_priority_keywords = ["urgent", "critical", "fix", "bug", "security", "hotfix"]
+        self.high_priority_categories = ["bug_fix", "security"]
+        
+        # Compile every keyword table once into a single-pass matcher
+        self.keyword_matcher = KeywordMatcher(
+            [keyword for keywords in self.categories.values() for keyword in keywords] + self.high_priority_keywords,
+            word_boundary=settings.KEYWORD_WORD_BOUNDARY
+        )
+        self.sentiment_lexicon = SentimentLexicon() if settings.SENTIMENT_ENGINE == "lexicon" else None
         
     async def analyze_commit(self, message: str) -> Dict[str, Any]:
         """Analyze commit message using AI/NLP"""
         try:
             # Sentiment analysis
-            blob = TextBlob(message)
-            sentiment = blob.sentiment.polarity
+            if self.sentiment_lexicon is not None:
+                sentiment = float(self.sentiment_lexicon.score_batch([message])[0])
+            else:
+                sentiment = TextBlob(message).sentiment.polarity
+            
+            # Keyword hits from a single pass feed categories and priority
+            keyword_hits = self.keyword_matcher.find(message.lower())
             
             # Category detection
-            categories = self._detect_categories(message.lower())
+            categories = self._detect_categories(keyword_hits)
             
             # Priority assessment
-            priority = self._assess_priority(message, sentiment, categories)
+            priority = self._assess_priority(keyword_hits, sentiment, categories)
             
             # Confidence score
             confidence = self._calculate_confidence(message, categories)
@@ -56,31 +74,21 @@ class AIProcessor:
                 "analysis_type": "commit_message"
             }
     
-    def _detect_categories(self, message: str) -> list:
-        """Detect commit categories based on keywords"""
-        detected_categories = []
-        
-        for category, keywords in self.categories.items():
-            for keyword in keywords:
-                if keyword in message:
-                    detected_categories.append(category)
-                    break
-        
-        return detected_categories
+    def _detect_categories(self, keyword_hits: Set[str]) -> list:
+        """Detect commit categories from matched keywords"""
+        return [
+            category for category, keywords in self.categories.items()
+            if any(keyword in keyword_hits for keyword in keywords)
+        ]
     
-    def _assess_priority(self, message: str, sentiment: float, categories: list) -> str:
+    def _assess_priority(self, keyword_hits: Set[str], sentiment: float, categories: list) -> str:
         """Assess commit priority"""
-        # High priority indicators
-        high_priority_keywords = ["urgent", "critical", "fix", "bug", "security", "hotfix"]
-        high_priority_categories = ["bug_fix", "security"]
-        
         # Check for high priority keywords
-        for keyword in high_priority_keywords:
-            if keyword in message.lower():
-                return "high"
+        if any(keyword in keyword_hits for keyword in self.high_priority_keywords):
+            return "high"
         
         # Check for high priority categories
-        for category in high_priority_categories:
+        for category in self.high_priority_categories:
             if category in categories:
                 return "high"
         
@@ -1,56 +1,78 @@
 import json
 import os
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import tempfile
+from collections import deque
+from typing import List, Dict, Any, Optional, Deque
+from datetime import datetime, timezone
 import asyncpg
 
 from app.core.config import settings
 from app.core.database import get_db
 
+JSON_WINDOW_SIZE = 100
+
+# Process-wide cache of the parsed commit.json and its serialized bytes, shared by
+# every DataStorage instance and validated against the file's (mtime, size)
+_json_cache: Dict[str, Any] = {"path": None, "signature": None, "data": None, "bytes": None}
+
 class DataStorage:
     def __init__(self):
         self.json_file_path = settings.JSON_FILE_PATH
+        # Last JSON_WINDOW_SIZE commits written to commit.json, newest first
+        self.json_window: Optional[Deque[Dict[str, Any]]] = None
         
     async def store_commit(self, commit_data: Dict[str, Any]) -> bool:
         """Store commit in PostgreSQL database"""
-        try:
-            db_pool = await get_db()
-            async with db_pool.acquire() as conn:
-                # Check if commit already exists
-                existing = await conn.fetchrow(
-                    "SELECT id FROM track_project.commits WHERE hash_key = $1",
-                    commit_data["hash_key"]
-                )
-                
-                if existing:
-                    print(f"Commit {commit_data['hash_key']} already exists")
-                    return False
-                
-                # Insert new commit
-                await conn.execute("""
-                    INSERT INTO track_project.commits (
-                        hash_key, commit_sha, message, author, author_email,
-                        repository, branch, committed_at, ai_processed, ai_analysis
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
-                """, 
-                    commit_data["hash_key"],
-                    commit_data["commit_sha"],
-                    commit_data["message"],
-                    commit_data["author"],
-                    commit_data["author_email"],
-                    commit_data["repository"],
-                    commit_data["branch"],
-                    commit_data["committed_at"],
-                    True,  # AI processed
-                    json.dumps(commit_data.get("ai_analysis", {}))
+        return await self.store_commits([commit_data]) == 1
+    
+    async def store_commits(self, commits: List[Dict[str, Any]]) -> int:
+        """Store a batch of commits, skipping hash keys that already exist.
+        
+        Returns the number of newly inserted commits. Database errors are raised,
+        so callers can tell a failed batch from one that was all duplicates.
+        """
+        if not commits:
+            return 0
+        db_pool = await get_db()
+        async with db_pool.acquire() as conn:
+            inserted = await conn.fetch("""
+                INSERT INTO track_project.commits (
+                    hash_key, commit_sha, message, author, author_email,
+                    repository, branch, committed_at, ai_processed, ai_analysis
                 )
-                
-                print(f"Stored commit: {commit_data['commit_sha'][:8]}")
-                return True
-                
-        except Exception as e:
-            print(f"Error storing commit: {e}")
-            return False
+                SELECT t.hash_key, t.commit_sha, t.message, t.author, t.author_email,
+                       t.repository, t.branch, t.committed_at, true, t.ai_analysis::json
+                FROM unnest(
+                    $1::text[], $2::text[], $3::text[], $4::text[], $5::text[],
+                    $6::text[], $7::text[], $8::timestamp[], $9::text[]
+                ) AS t(hash_key, commit_sha, message, author, author_email,
+                       repository, branch, committed_at, ai_analysis)
+                ON CONFLICT (hash_key) DO NOTHING
+                RETURNING commit_sha
+            """,
+                [commit["hash_key"] for commit in commits],
+                [commit["commit_sha"] for commit in commits],
+                [commit["message"] for commit in commits],
+                [commit["author"] for commit in commits],
+                [commit["author_email"] for commit in commits],
+                [commit["repository"] for commit in commits],
+                [commit["branch"] for commit in commits],
+                [self._to_naive_utc(commit["committed_at"]) for commit in commits],
+                [json.dumps(commit.get("ai_analysis", {})) for commit in commits]
+            )
+            
+            for row in inserted:
+                print(f"Stored commit: {row['commit_sha'][:8]}")
+            skipped = len(commits) - len(inserted)
+            if skipped:
+                print(f"Skipped {skipped} commits that already exist")
+            return len(inserted)
+    
+    def _to_naive_utc(self, value: Optional[datetime]) -> Optional[datetime]:
+        """Convert an aware datetime to naive UTC for TIMESTAMP columns"""
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
     
     async def get_latest_commits(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get latest commits from database"""
@@ -122,19 +144,16 @@ class DataStorage:
         try:
             db_pool = await get_db()
             async with db_pool.acquire() as conn:
-                # Total commits
-                total_commits = await conn.fetchval("SELECT COUNT(*) FROM track_project.commits")
-                
-                # AI processed commits
-                ai_processed = await conn.fetchval(
-                    "SELECT COUNT(*) FROM track_project.commits WHERE ai_processed = true"
-                )
-                
-                # Unique repositories
-                repositories = await conn.fetch(
-                    "SELECT DISTINCT repository FROM track_project.commits"
-                )
-                repo_list = [row["repository"] for row in repositories]
+                # Per-repository rollup maintained by triggers on track_project.commits
+                rows = await conn.fetch("""
+                    SELECT repository, total_commits, ai_processed_commits
+                    FROM track_project.repo_stats
+                    WHERE total_commits > 0
+                    ORDER BY repository
+                """)
+                total_commits = sum(row["total_commits"] for row in rows)
+                ai_processed = sum(row["ai_processed_commits"] for row in rows)
+                repo_list = [row["repository"] or None for row in rows]
                 
                 # Last fetch time
                 last_fetch = await conn.fetchval(
@@ -157,68 +176,129 @@ class DataStorage:
                 "last_fetch": None
             }
     
-    def update_json_file(self, commit_data: Dict[str, Any]) -> bool:
-        """Update commit.json file with new commit data"""
+    def update_json_file(self, commits: List[Dict[str, Any]]) -> bool:
+        """Add a fetch cycle's commits to commit.json with a single atomic write"""
+        if not commits:
+            return True
         try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(self.json_file_path), exist_ok=True)
+            window = self._get_json_window()
             
-            # Load existing data or create new
-            if os.path.exists(self.json_file_path):
-                with open(self.json_file_path, 'r') as f:
-                    data = json.load(f)
-            else:
-                data = {
-                    "commits": [],
-                    "last_updated": datetime.now().isoformat(),
-                    "total_commits": 0
-                }
+            # Add new commits to the beginning, the window drops the oldest
+            for commit_data in commits:
+                window.appendleft({
+                    "hash_key": commit_data["hash_key"],
+                    "commit_sha": commit_data["commit_sha"],
+                    "message": commit_data["message"],
+                    "author": commit_data["author"],
+                    "repository": commit_data["repository"],
+                    "committed_at": commit_data["committed_at"].isoformat(),
+                    "ai_analysis": commit_data.get("ai_analysis", {})
+                })
             
-            # Add new commit
-            commit_entry = {
-                "hash_key": commit_data["hash_key"],
-                "commit_sha": commit_data["commit_sha"],
-                "message": commit_data["message"],
-                "author": commit_data["author"],
-                "repository": commit_data["repository"],
-                "committed_at": commit_data["committed_at"].isoformat(),
-                "ai_analysis": commit_data.get("ai_analysis", {})
+            data = {
+                "commits": list(window),
+                "last_updated": datetime.now().isoformat(),
+                "total_commits": len(window)
             }
-            
-            data["commits"].insert(0, commit_entry)  # Add to beginning
-            data["last_updated"] = datetime.now().isoformat()
-            data["total_commits"] = len(data["commits"])
-            
-            # Keep only last 100 commits in JSON file
-            if len(data["commits"]) > 100:
-                data["commits"] = data["commits"][:100]
-            
-            # Write back to file
-            with open(self.json_file_path, 'w') as f:
-                json.dump(data, f, indent=2)
-            
+            self._write_json_atomic(data)
             return True
             
         except Exception as e:
             print(f"Error updating JSON file: {e}")
             return False
     
+    def _get_json_window(self) -> Deque[Dict[str, Any]]:
+        """Load the commit window from commit.json on first use"""
+        if self.json_window is None:
+            commits = []
+            try:
+                if os.path.exists(self.json_file_path):
+                    with open(self.json_file_path, 'r') as f:
+                        commits = json.load(f).get("commits", [])
+            except Exception as e:
+                print(f"Error reading JSON file, starting a new one: {e}")
+            self.json_window = deque(commits[:JSON_WINDOW_SIZE], maxlen=JSON_WINDOW_SIZE)
+        return self.json_window
+    
+    def _write_json_atomic(self, data: Dict[str, Any]):
+        """Write commit.json via a temp file and rename so readers never see a partial file"""
+        directory = os.path.dirname(self.json_file_path)
+        os.makedirs(directory, exist_ok=True)
+        
+        raw = json.dumps(data, indent=2).encode()
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".commit-", suffix=".json.tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(raw)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.json_file_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        
+        self._cache_written_json(data, raw)
+    
     def get_json_data(self) -> Dict[str, Any]:
-        """Get data from commit.json file"""
+        """Get data from commit.json file.
+        
+        The parsed document is cached per process; callers must not mutate it.
+        """
         try:
-            if os.path.exists(self.json_file_path):
-                with open(self.json_file_path, 'r') as f:
-                    return json.load(f)
-            else:
-                return {
-                    "commits": [],
-                    "last_updated": datetime.now().isoformat(),
-                    "total_commits": 0
-                }
+            data, _ = self._load_json_cached()
+            if data is not None:
+                return data
+            return self._empty_json_data()
         except Exception as e:
             print(f"Error reading JSON file: {e}")
-            return {
-                "commits": [],
-                "last_updated": datetime.now().isoformat(),
-                "total_commits": 0
-            }
+            return self._empty_json_data()
+    
+    def get_json_bytes(self) -> bytes:
+        """Get commit.json as pre-serialized JSON bytes"""
+        try:
+            _, raw = self._load_json_cached()
+            if raw is not None:
+                return raw
+        except Exception as e:
+            print(f"Error reading JSON file: {e}")
+        return json.dumps(self._empty_json_data()).encode()
+    
+    def _load_json_cached(self):
+        """Return (data, bytes) for commit.json, re-reading only when the file changed"""
+        try:
+            stat = os.stat(self.json_file_path)
+        except FileNotFoundError:
+            return None, None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        
+        if _json_cache["path"] == self.json_file_path and _json_cache["signature"] == signature:
+            return _json_cache["data"], _json_cache["bytes"]
+        
+        with open(self.json_file_path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw)
+        _json_cache.update(path=self.json_file_path, signature=signature, data=data, bytes=raw)
+        return data, raw
+    
+    def _cache_written_json(self, data: Dict[str, Any], raw: bytes):
+        """Prime the process cache with a document this process just wrote"""
+        try:
+            stat = os.stat(self.json_file_path)
+            _json_cache.update(
+                path=self.json_file_path,
+                signature=(stat.st_mtime_ns, stat.st_size),
+                data=data,
+                bytes=raw
+            )
+        except OSError:
+            _json_cache.update(path=None, signature=None, data=None, bytes=None)
+    
+    def _empty_json_data(self) -> Dict[str, Any]:
+        """Document returned when commit.json does not exist yet"""
+        return {
+            "commits": [],
+            "last_updated": datetime.now().isoformat(),
+            "total_commits": 0
+        }
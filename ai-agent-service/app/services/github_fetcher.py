@@ -1,7 +1,7 @@
 import aiohttp
 import asyncio
-from datetime import datetime
-from typing import List, Dict, Any
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
 import json
 
 from app.core.config import settings
@@ -9,6 +9,7 @@ from app.core.database import get_db
 from app.services.ai_processor import AIProcessor
 from app.services.data_storage import DataStorage
 from app.utils.hash_generator import HashGenerator
+from app.utils.response_cache import ResponseCache
 
 class GitHubFetcher:
     def __init__(self):
@@ -18,9 +19,15 @@ class GitHubFetcher:
         self.ai_processor = AIProcessor()
         self.data_storage = DataStorage()
         self.hash_generator = HashGenerator()
+        self.response_cache = ResponseCache()
         
-    async def fetch_commits(self) -> List[Dict[str, Any]]:
-        """Fetch commits from GitHub repository"""
+    async def fetch_commits(self, since: Optional[datetime] = None,
+                            last_sha: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Fetch commits from GitHub repository, newest first.
+        
+        With a watermark (``since`` UTC time and/or ``last_sha``) Link ``next`` pages
+        are followed until the watermark is reached, so no new commit is skipped.
+        """
         if not self.github_token:
             print("GitHub token not configured")
             return []
@@ -31,16 +38,31 @@ class GitHubFetcher:
         }
         
         url = f"{self.base_url}/repos/{self.repository}/commits"
+        params = {"since": since.strftime("%Y-%m-%dT%H:%M:%SZ"), "per_page": 100} if since else None
         
         try:
             async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        commits = await response.json()
-                        return commits
-                    else:
-                        print(f"Error fetching commits: {response.status}")
+                if not since and not last_sha:
+                    status, commits = await self.response_cache.get(session, url, headers)
+                    if status != 200:
+                        print(f"Error fetching commits: {status}")
+                        return []
+                    return commits
+                
+                params = params or {"per_page": 100}
+                commits = []
+                for _ in range(max(settings.GITHUB_MAX_PAGES, 1)):
+                    status, page, next_url = await self.response_cache.get_page(session, url, headers, params=params)
+                    if status != 200:
+                        print(f"Error fetching commits: {status}")
                         return []
+                    commits.extend(page)
+                    if not next_url or (last_sha and any(commit.get("sha") == last_sha for commit in page)):
+                        return commits
+                    url, params = next_url, None
+                
+                print(f"Watermark not reached after {settings.GITHUB_MAX_PAGES} pages, older new commits are not fetched")
+                return commits
         except Exception as e:
             print(f"Error fetching commits: {e}")
             return []
@@ -68,43 +90,100 @@ class GitHubFetcher:
         return commit_info
     
     async def fetch_and_process_commits(self):
-        """Fetch commits from GitHub and process them"""
+        """Fetch commits newer than the stored watermark from GitHub and process them"""
         print(f"Fetching commits from {self.repository}")
         
+        last_sha, last_commit_at = await self.get_watermark()
+        
         # Fetch commits from GitHub
-        commits = await self.fetch_commits()
+        commits = await self.fetch_commits(since=last_commit_at, last_sha=last_sha)
+        
+        # GitHub lists newest first; keep only commits newer than the last seen SHA
+        new_commits = []
+        for commit_data in commits:
+            if last_sha and commit_data.get("sha") == last_sha:
+                break
+            new_commits.append(commit_data)
         
-        if not commits:
-            print("No commits found or error occurred")
+        if not new_commits:
+            print("No new commits found or error occurred")
+            await self.update_tracking_config()
             return
         
-        # Process each commit
-        for commit_data in commits:
+        # Process each commit, remembering the oldest one that failed
+        processed = []
+        oldest_failed = None
+        for index, commit_data in enumerate(new_commits):
             try:
                 commit_info = await self.process_commit(commit_data)
-                
-                # Store in database
-                await self.data_storage.store_commit(commit_info)
-                
-                # Update JSON file
-                self.data_storage.update_json_file(commit_info)
+                processed.append(commit_info)
                 
                 print(f"Processed commit: {commit_info['commit_sha'][:8]}")
                 
             except Exception as e:
+                oldest_failed = index
                 print(f"Error processing commit {commit_data.get('sha', 'unknown')}: {e}")
         
-        print(f"Processed {len(commits)} commits")
+        # Store the whole batch in database, existing commits are skipped
+        try:
+            await self.data_storage.store_commits(processed)
+        except Exception as e:
+            print(f"Error storing commits, watermark left unchanged: {e}")
+            return
+        
+        # Update JSON file once for the whole cycle
+        self.data_storage.update_json_file(processed)
+        
+        print(f"Processed {len(processed)} of {len(new_commits)} commits")
         
-        # Update tracking configuration
-        await self.update_tracking_config()
+        # Advance the watermark to the newest commit with every older new commit stored;
+        # commits that failed are newer than it and get fetched again next cycle
+        stored_from = 0 if oldest_failed is None else oldest_failed + 1
+        if stored_from < len(new_commits):
+            newest = new_commits[stored_from]
+            await self.update_tracking_config(
+                newest.get("sha"),
+                self._parse_commit_date(newest)
+            )
+        else:
+            await self.update_tracking_config()
     
-    async def update_tracking_config(self):
-        """Update last checked timestamp"""
+    async def get_watermark(self) -> Tuple[Optional[str], Optional[datetime]]:
+        """Get the last seen commit SHA and its UTC commit time"""
+        try:
+            db_pool = await get_db()
+            async with db_pool.acquire() as conn:
+                row = await conn.fetchrow("""
+                    SELECT last_commit_sha, last_commit_at
+                    FROM track_project.tracking_config 
+                    WHERE repository = $1
+                """, self.repository)
+                if row:
+                    return row["last_commit_sha"], row["last_commit_at"]
+        except Exception as e:
+            print(f"Error reading fetch watermark: {e}")
+        return None, None
+    
+    async def update_tracking_config(self, last_commit_sha: Optional[str] = None,
+                                     last_commit_at: Optional[datetime] = None):
+        """Update last checked timestamp and, when given, the fetch watermark"""
         db_pool = await get_db()
         async with db_pool.acquire() as conn:
             await conn.execute("""
-                UPDATE tracking_config 
-                SET last_checked = $1 
-                WHERE repository = $2
-            """, datetime.now(), self.repository)
+                INSERT INTO track_project.tracking_config (
+                    repository, last_checked, last_commit_sha, last_commit_at
+                ) VALUES ($1, $2, $3, $4)
+                ON CONFLICT (repository) DO UPDATE SET
+                    last_checked = EXCLUDED.last_checked,
+                    last_commit_sha = COALESCE(EXCLUDED.last_commit_sha, tracking_config.last_commit_sha),
+                    last_commit_at = COALESCE(EXCLUDED.last_commit_at, tracking_config.last_commit_at)
+            """, self.repository, datetime.now(), last_commit_sha, last_commit_at)
+    
+    def _parse_commit_date(self, commit_data: Dict[str, Any]) -> Optional[datetime]:
+        """Commit author date as naive UTC"""
+        try:
+            date_str = commit_data["commit"]["author"]["date"]
+            parsed = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+            return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        except Exception:
+            return None
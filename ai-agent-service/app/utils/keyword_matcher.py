@@ -0,0 +1,28 @@
+import re
+from typing import List, Set
+
+# Copy of ai-service's KeywordMatcher (each service builds its own image); tests keep the two identical
+class KeywordMatcher:
+    """All keywords compiled into one regex that reports every hit in a single pass.
+    
+    The pattern is a zero-width lookahead, so it is tried at every position and
+    overlapping keywords are all found ("hotfix" yields "hotfix" and "fix").
+    Keywords that are prefixes of a longer match at the same position
+    ("doc" in "document") are added from a precomputed closure.
+    """
+    
+    def __init__(self, keywords: List[str], word_boundary: bool = False):
+        self.keywords = sorted(set(keywords), key=len, reverse=True)
+        alternation = "|".join(re.escape(keyword) for keyword in self.keywords)
+        self.pattern = re.compile((r"\b" if word_boundary else "") + f"(?=({alternation}))")
+        self.prefixes = {
+            keyword: [other for other in self.keywords if keyword.startswith(other)]
+            for keyword in self.keywords
+        }
+    
+    def find(self, text: str) -> Set[str]:
+        """Return the set of keywords occurring in lowercase text"""
+        hits: Set[str] = set()
+        for match in self.pattern.finditer(text):
+            hits.update(self.prefixes[match.group(1)])
+        return hits
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 500):
+        self.max_entries = max_entries
+        # URL -> {"etag", "last_modified", "body", "next_url"}, least recently used first
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    
+    async def get(self, session, url: str, headers: Dict[str, str],
+                  params: Optional[Dict[str, Any]] = None) -> Tuple[int, Any]:
+        """GET a URL with ETag / Last-Modified revalidation.
+        
+        Returns (status, body). A 304 is reported as 200 with the cached body.
+        """
+        status, body, _ = await self.get_page(session, url, headers, params=params)
+        return status, body
+    
+    async def get_page(self, session, url: str, headers: Dict[str, str],
+                       params: Optional[Dict[str, Any]] = None) -> Tuple[int, Any, Optional[str]]:
+        """Like get, also returning the Link ``next`` URL (or None)"""
+        key = self._cache_key(url, params)
+        
+        request_headers = dict(headers)
+        entry = self.entries.get(key)
+        if entry:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+        
+        async with session.get(url, headers=request_headers, params=params) as response:
+            if response.status == 304 and entry:
+                self.entries.move_to_end(key)
+                return 200, entry["body"], entry.get("next_url")
+            if response.status != 200:
+                return response.status, None, None
+            
+            body = await response.json()
+            next_link = response.links.get("next")
+            next_url = str(next_link["url"]) if next_link else None
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                self.entries[key] = {"etag": etag, "last_modified": last_modified, "body": body, "next_url": next_url}
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            return 200, body, next_url
+    
+    def clear(self):
+        """Clear cached responses (for testing)"""
+        self.entries.clear()
+    
+    def _cache_key(self, url: str, params: Optional[Dict[str, Any]]) -> str:
+        """Build a cache key from the URL and sorted query parameters"""
+        if not params:
+            return url
+        return f"{url}?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
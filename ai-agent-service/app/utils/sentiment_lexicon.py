@@ -0,0 +1,190 @@
+import re
+from typing import List
+
+import numpy as np
+from textblob import _text as pattern_text
+from textblob.en import sentiment as pattern_sentiment
+
+# Copy of ai-service's SentimentLexicon (each service builds its own image); tests keep the two identical
+class SentimentLexicon:
+    """TextBlob's polarity lexicon compiled into flat token-id arrays and scored with NumPy.
+    
+    Mirrors the pattern analyzer's rules: polarity is the mean over known words,
+    a known adverb multiplies the next known word by its intensity (and is merged
+    into it), a preceding negation flips and halves the score, and "!" boosts the
+    previous word. Messages with emoticons or "(!)" are left to the analyzer itself.
+    """
+    
+    # The pattern tokenizer splits "isn't" into "is n ' t", so contractions are never negations
+    CONTRACTION_PATTERN = re.compile(r"(n't|'d|'m|'s|'ll|'re|'ve)")
+    QUOTE_PATTERN = re.compile("(['\"“”‘’])")
+    # Punctuation split off the ends of a token; "." only at the end, and not from abbreviations
+    LEADING_PUNCTUATION = pattern_text.PUNCTUATION.replace(".", "")
+    TRAILING_PUNCTUATION = tuple(LEADING_PUNCTUATION) + (".",)
+    # Each whitespace-separated token as (leading punctuation, word, trailing punctuation)
+    TOKEN_PATTERN = re.compile(
+        r"(?<!\S)(?=\S)([{0}]*)(\S*?)([{0}.]*)(?!\S)".format(re.escape(LEADING_PUNCTUATION))
+    )
+    EMOTICONS = {emoticon.lower() for emoticons in pattern_text.EMOTICONS.values() for emoticon in emoticons} | {"(!)"}
+    
+    def __init__(self):
+        if dict.__len__(pattern_sentiment) == 0:
+            pattern_sentiment.load()
+        words = sorted(word for word in dict.keys(pattern_sentiment) if " " not in word)
+        negations = [word for word in pattern_sentiment.negations if word not in pattern_sentiment]
+        
+        # Id 0 is reserved for unknown tokens
+        self.vocab = {word: i for i, word in enumerate(words + negations, start=1)}
+        size = len(self.vocab) + 1
+        self.polarity = np.zeros(size)
+        self.intensity = np.ones(size)
+        self.known = np.zeros(size, dtype=bool)
+        self.modifier = np.zeros(size, dtype=bool)
+        self.negation = np.zeros(size, dtype=bool)
+        # Adverbs a following negation attaches to ("really not good"); the analyzer tests the -ly suffix
+        self.ly_modifier = np.zeros(size, dtype=bool)
+        for word in words:
+            i = self.vocab[word]
+            scores = dict.__getitem__(pattern_sentiment, word)
+            self.polarity[i], _, self.intensity[i] = scores[None]
+            self.known[i] = True
+            self.modifier[i] = any(pos in scores for pos in pattern_sentiment.modifiers)
+            self.ly_modifier[i] = self.modifier[i] and pattern_sentiment.modifier(word)
+        for word in pattern_sentiment.negations:
+            self.negation[self.vocab[word]] = True
+    
+    def is_abbreviation(self, token: str) -> bool:
+        """Whether the pattern tokenizer keeps the trailing period of token"""
+        return (
+            token in pattern_text.ABBREVIATIONS
+            or pattern_text.RE_ABBR1.match(token) is not None
+            or pattern_text.RE_ABBR2.match(token) is not None
+            or pattern_text.RE_ABBR3.match(token) is not None
+        )
+    
+    def tokenize(self, message: str) -> List[str]:
+        """Lowercase tokens, split the way the pattern tokenizer splits them.
+        
+        Punctuation is only split off the ends of whitespace-separated tokens, so
+        identifiers like "has_more" or "debug=true" stay whole, as does "x...y".
+        """
+        message = self.QUOTE_PATTERN.sub(r" \1 ", self.CONTRACTION_PATTERN.sub(r" \1", message))
+        tokens = []
+        for lead, token, trail in self.TOKEN_PATTERN.findall(message):
+            tokens.extend(lead)
+            if not trail:
+                if token:
+                    tokens.append(token)
+                continue
+            token += trail
+            tail = []
+            while token.endswith(self.TRAILING_PUNCTUATION):
+                if token[-1] != ".":
+                    tail.append(token[-1])
+                    token = token[:-1]
+                if token.endswith("..."):
+                    tail.append("...")
+                    token = token[:-3].rstrip(".")
+                if token.endswith("."):
+                    if self.is_abbreviation(token):
+                        break
+                    tail.append(".")
+                    token = token[:-1]
+            if token:
+                tokens.append(token)
+            tokens.extend(reversed(tail))
+        text = pattern_text.RE_SARCASM.sub("(!)", " ".join(tokens))
+        text = pattern_text.RE_EMOTICONS.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), text)
+        return text.lower().split()
+    
+    def score_batch(self, messages: List[str]) -> np.ndarray:
+        """Polarity of every message in one vectorized pass"""
+        tokenized = [self.tokenize(message) for message in messages]
+        # Emoticons and "(!)" add assessments of their own, so the analyzer scores those messages
+        fallback = [i for i, tokens in enumerate(tokenized) if not self.EMOTICONS.isdisjoint(tokens)]
+        for i in fallback:
+            tokenized[i] = []
+        polarity = self.score_tokens(tokenized)
+        for i in fallback:
+            polarity[i] = pattern_sentiment(messages[i])[0]
+        return polarity
+    
+    def score_tokens(self, tokenized: List[List[str]]) -> np.ndarray:
+        """Polarity of every tokenized message"""
+        token_ids = []
+        token_lengths = []
+        exclamations = []
+        message_index = []
+        for i, tokens in enumerate(tokenized):
+            token_ids.extend(self.vocab.get(token, 0) for token in tokens)
+            token_lengths.extend(len(token) for token in tokens)
+            exclamations.extend(token == "!" for token in tokens)
+            message_index.extend([i] * len(tokens))
+        if not token_ids:
+            return np.zeros(len(tokenized))
+        
+        ids = np.array(token_ids)
+        owner = np.array(message_index)
+        positions = np.arange(len(ids))
+        known = self.known[ids]
+        negation = self.negation[ids]
+        
+        # Unknown small words are looked through: one letter by a negation ("not a good"),
+        # up to two letters by an adverb ("really is good")
+        lengths = np.array(token_lengths)
+        skipped = ~known & (lengths <= 1)
+        modifier_skipped = ~known & ~negation & (lengths <= 2)
+        
+        # Previous token an adverb can reach, and previous one a negation can reach
+        prev = np.r_[-1, np.maximum.accumulate(np.where(negation | modifier_skipped, -1, positions))[:-1]]
+        has_prev = (prev >= 0) & (owner[np.maximum(prev, 0)] == owner)
+        prev = np.maximum(prev, 0)
+        # A negation right after an -ly adverb is used up by it ("really not very good")
+        absorbed = negation & ~known & has_prev & self.ly_modifier[ids[prev]]
+        before = np.r_[-1, np.maximum.accumulate(np.where(skipped, -1, positions))[:-1]]
+        has_before = (before >= 0) & (owner[np.maximum(before, 0)] == owner)
+        before = np.maximum(before, 0)
+        negation_before = has_before & negation[before] & ~absorbed[before]
+        
+        # Known word after a known adverb: scaled by its intensity and merged with it
+        after_modifier = known & has_prev & self.known[ids[prev]] & self.modifier[ids[prev]]
+        # A negation longer than two letters ends a non -ly adverb's reach ("very not good")
+        long_negations = np.cumsum(negation & (lengths > 2))
+        broken = long_negations[np.maximum(positions - 1, 0)] > long_negations[prev]
+        after_modifier &= ~(broken & ~self.ly_modifier[ids[prev]])
+        merged_into_next = np.zeros(len(ids), dtype=bool)
+        merged_into_next[prev[after_modifier]] = True
+        
+        # "not good" flips and halves the score; "not really good" also inverts the intensity
+        negated_modifier = after_modifier & negation_before[prev]
+        intensity = self.intensity[ids[prev]]
+        intensity = np.where(negated_modifier, 1.0 / intensity, intensity)
+        scores = np.where(after_modifier, np.clip(self.polarity[ids] * intensity, -1.0, 1.0), self.polarity[ids])
+        
+        # "!" boosts the last known word by 1.25, unless that word is an adverb later merged away
+        last_known = np.maximum.accumulate(np.where(known, positions, -1))
+        bangs = positions[np.array(exclamations)]
+        targets = last_known[bangs]
+        targets = targets[(targets >= 0) & (owner[np.maximum(targets, 0)] == owner[bangs])]
+        targets = targets[~merged_into_next[targets]]
+        boosts = np.bincount(targets, minlength=len(ids))
+        scores = np.where(boosts > 0, np.clip(scores * 1.25 ** boosts, -1.0, 1.0), scores)
+        
+        # An adverb followed by a negation ("really not ...") carries the negation itself
+        last = len(ids) - 1
+        following = np.minimum.accumulate(np.where(modifier_skipped, len(ids), positions)[::-1])[::-1]
+        after = np.minimum(np.r_[following[1:], len(ids)], last)
+        negation_after = (positions < after) & (owner[after] == owner) & negation[after]
+        negated = negation_before | negated_modifier | (known & self.ly_modifier[ids] & negation_after)
+        # A chain of adverbs forms one chunk, which carries the negation to its end
+        while True:
+            chained = negated | (after_modifier & negated[prev])
+            if (chained == negated).all():
+                break
+            negated = chained
+        scores = np.where(negated, scores * -0.5, scores)
+        
+        counted = known & ~merged_into_next
+        totals = np.bincount(owner[counted], weights=scores[counted], minlength=len(tokenized))
+        counts = np.bincount(owner[counted], minlength=len(tokenized))
+        return totals / np.maximum(counts, 1)
@@ -1,5 +1,6 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 import asyncio
 import os
 from datetime import datetime
@@ -99,6 +100,11 @@ async def track_now():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving data: {str(e)}")
 
+@app.get("/json-data")
+async def get_json_data():
+    """Serve commit.json from the in-memory cache as pre-serialized bytes"""
+    return Response(content=data_storage.get_json_bytes(), media_type="application/json")
+
 @app.post("/fetch-commits")
 async def fetch_commits(background_tasks: BackgroundTasks):
     """Manually trigger commit fetching"""
@@ -2,8 +2,20 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from textblob import TextBlob
+from textblob import _text as pattern_text
+from textblob.en import sentiment as pattern_sentiment
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import hashlib
+import json
+import os
 import re
-from typing import List, Dict, Any
+import sqlite3
+import threading
+import joblib
+import numpy as np
+from typing import List, Dict, Any, Optional, Set
 from datetime import datetime
 import aiohttp
 
@@ -28,9 +40,482 @@ CATEGORIES = {
     "performance": ["performance", "speed", "fast", "slow", "optimize"]
 }
 
+HIGH_PRIORITY_KEYWORDS = ["urgent", "critical", "fix", "bug", "security", "hotfix"]
+HIGH_PRIORITY_CATEGORIES = ["bug_fix", "security"]
+
+# Match keywords only at the start of a word ("prefix" no longer matches "fix")
+KEYWORD_WORD_BOUNDARY = os.getenv("KEYWORD_WORD_BOUNDARY", "False").lower() == "true"
+
+class KeywordMatcher:
+    """All keywords compiled into one regex that reports every hit in a single pass.
+    
+    The pattern is a zero-width lookahead, so it is tried at every position and
+    overlapping keywords are all found ("hotfix" yields "hotfix" and "fix").
+    Keywords that are prefixes of a longer match at the same position
+    ("doc" in "document") are added from a precomputed closure.
+    """
+    
+    def __init__(self, keywords: List[str], word_boundary: bool = False):
+        self.keywords = sorted(set(keywords), key=len, reverse=True)
+        alternation = "|".join(re.escape(keyword) for keyword in self.keywords)
+        self.pattern = re.compile((r"\b" if word_boundary else "") + f"(?=({alternation}))")
+        self.prefixes = {
+            keyword: [other for other in self.keywords if keyword.startswith(other)]
+            for keyword in self.keywords
+        }
+    
+    def find(self, text: str) -> Set[str]:
+        """Return the set of keywords occurring in lowercase text"""
+        hits: Set[str] = set()
+        for match in self.pattern.finditer(text):
+            hits.update(self.prefixes[match.group(1)])
+        return hits
+
+KEYWORD_MATCHER = KeywordMatcher(
+    [keyword for keywords in CATEGORIES.values() for keyword in keywords] + HIGH_PRIORITY_KEYWORDS,
+    word_boundary=KEYWORD_WORD_BOUNDARY
+)
+
+# Keyword tables compiled once for batch scoring: every distinct keyword gets a
+# column, and CATEGORY_MATRIX maps keyword columns to category columns.
+CATEGORY_NAMES = list(CATEGORIES.keys())
+BATCH_KEYWORDS = np.array(sorted(KEYWORD_MATCHER.keywords))
+BATCH_KEYWORD_INDEX = {keyword: i for i, keyword in enumerate(BATCH_KEYWORDS)}
+CATEGORY_MATRIX = np.array(
+    [[keyword in CATEGORIES[category] for category in CATEGORY_NAMES] for keyword in BATCH_KEYWORDS],
+    dtype=np.int32
+)
+PRIORITY_KEYWORD_MASK = np.isin(BATCH_KEYWORDS, HIGH_PRIORITY_KEYWORDS)
+PRIORITY_CATEGORY_MASK = np.isin(CATEGORY_NAMES, HIGH_PRIORITY_CATEGORIES)
+
+# Sentiment engine: "textblob" (pattern analyzer) or "lexicon" (vectorized table lookup)
+SENTIMENT_ENGINE = os.getenv("SENTIMENT_ENGINE", "textblob").lower()
+
+class SentimentLexicon:
+    """TextBlob's polarity lexicon compiled into flat token-id arrays and scored with NumPy.
+    
+    Mirrors the pattern analyzer's rules: polarity is the mean over known words,
+    a known adverb multiplies the next known word by its intensity (and is merged
+    into it), a preceding negation flips and halves the score, and "!" boosts the
+    previous word. Messages with emoticons or "(!)" are left to the analyzer itself.
+    """
+    
+    # The pattern tokenizer splits "isn't" into "is n ' t", so contractions are never negations
+    CONTRACTION_PATTERN = re.compile(r"(n't|'d|'m|'s|'ll|'re|'ve)")
+    QUOTE_PATTERN = re.compile("(['\"“”‘’])")
+    # Punctuation split off the ends of a token; "." only at the end, and not from abbreviations
+    LEADING_PUNCTUATION = pattern_text.PUNCTUATION.replace(".", "")
+    TRAILING_PUNCTUATION = tuple(LEADING_PUNCTUATION) + (".",)
+    # Each whitespace-separated token as (leading punctuation, word, trailing punctuation)
+    TOKEN_PATTERN = re.compile(
+        r"(?<!\S)(?=\S)([{0}]*)(\S*?)([{0}.]*)(?!\S)".format(re.escape(LEADING_PUNCTUATION))
+    )
+    EMOTICONS = {emoticon.lower() for emoticons in pattern_text.EMOTICONS.values() for emoticon in emoticons} | {"(!)"}
+    
+    def __init__(self):
+        if dict.__len__(pattern_sentiment) == 0:
+            pattern_sentiment.load()
+        words = sorted(word for word in dict.keys(pattern_sentiment) if " " not in word)
+        negations = [word for word in pattern_sentiment.negations if word not in pattern_sentiment]
+        
+        # Id 0 is reserved for unknown tokens
+        self.vocab = {word: i for i, word in enumerate(words + negations, start=1)}
+        size = len(self.vocab) + 1
+        self.polarity = np.zeros(size)
+        self.intensity = np.ones(size)
+        self.known = np.zeros(size, dtype=bool)
+        self.modifier = np.zeros(size, dtype=bool)
+        self.negation = np.zeros(size, dtype=bool)
+        # Adverbs a following negation attaches to ("really not good"); the analyzer tests the -ly suffix
+        self.ly_modifier = np.zeros(size, dtype=bool)
+        for word in words:
+            i = self.vocab[word]
+            scores = dict.__getitem__(pattern_sentiment, word)
+            self.polarity[i], _, self.intensity[i] = scores[None]
+            self.known[i] = True
+            self.modifier[i] = any(pos in scores for pos in pattern_sentiment.modifiers)
+            self.ly_modifier[i] = self.modifier[i] and pattern_sentiment.modifier(word)
+        for word in pattern_sentiment.negations:
+            self.negation[self.vocab[word]] = True
+    
+    def is_abbreviation(self, token: str) -> bool:
+        """Whether the pattern tokenizer keeps the trailing period of token"""
+        return (
+            token in pattern_text.ABBREVIATIONS
+            or pattern_text.RE_ABBR1.match(token) is not None
+            or pattern_text.RE_ABBR2.match(token) is not None
+            or pattern_text.RE_ABBR3.match(token) is not None
+        )
+    
+    def tokenize(self, message: str) -> List[str]:
+        """Lowercase tokens, split the way the pattern tokenizer splits them.
+        
+        Punctuation is only split off the ends of whitespace-separated tokens, so
+        identifiers like "has_more" or "debug=true" stay whole, as does "x...y".
+        """
+        message = self.QUOTE_PATTERN.sub(r" \1 ", self.CONTRACTION_PATTERN.sub(r" \1", message))
+        tokens = []
+        for lead, token, trail in self.TOKEN_PATTERN.findall(message):
+            tokens.extend(lead)
+            if not trail:
+                if token:
+                    tokens.append(token)
+                continue
+            token += trail
+            tail = []
+            while token.endswith(self.TRAILING_PUNCTUATION):
+                if token[-1] != ".":
+                    tail.append(token[-1])
+                    token = token[:-1]
+                if token.endswith("..."):
+                    tail.append("...")
+                    token = token[:-3].rstrip(".")
+                if token.endswith("."):
+                    if self.is_abbreviation(token):
+                        break
+                    tail.append(".")
+                    token = token[:-1]
+            if token:
+                tokens.append(token)
+            tokens.extend(reversed(tail))
+        text = pattern_text.RE_SARCASM.sub("(!)", " ".join(tokens))
+        text = pattern_text.RE_EMOTICONS.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), text)
+        return text.lower().split()
+    
+    def score_batch(self, messages: List[str]) -> np.ndarray:
+        """Polarity of every message in one vectorized pass"""
+        tokenized = [self.tokenize(message) for message in messages]
+        # Emoticons and "(!)" add assessments of their own, so the analyzer scores those messages
+        fallback = [i for i, tokens in enumerate(tokenized) if not self.EMOTICONS.isdisjoint(tokens)]
+        for i in fallback:
+            tokenized[i] = []
+        polarity = self.score_tokens(tokenized)
+        for i in fallback:
+            polarity[i] = pattern_sentiment(messages[i])[0]
+        return polarity
+    
+    def score_tokens(self, tokenized: List[List[str]]) -> np.ndarray:
+        """Polarity of every tokenized message"""
+        token_ids = []
+        token_lengths = []
+        exclamations = []
+        message_index = []
+        for i, tokens in enumerate(tokenized):
+            token_ids.extend(self.vocab.get(token, 0) for token in tokens)
+            token_lengths.extend(len(token) for token in tokens)
+            exclamations.extend(token == "!" for token in tokens)
+            message_index.extend([i] * len(tokens))
+        if not token_ids:
+            return np.zeros(len(tokenized))
+        
+        ids = np.array(token_ids)
+        owner = np.array(message_index)
+        positions = np.arange(len(ids))
+        known = self.known[ids]
+        negation = self.negation[ids]
+        
+        # Unknown small words are looked through: one letter by a negation ("not a good"),
+        # up to two letters by an adverb ("really is good")
+        lengths = np.array(token_lengths)
+        skipped = ~known & (lengths <= 1)
+        modifier_skipped = ~known & ~negation & (lengths <= 2)
+        
+        # Previous token an adverb can reach, and previous one a negation can reach
+        prev = np.r_[-1, np.maximum.accumulate(np.where(negation | modifier_skipped, -1, positions))[:-1]]
+        has_prev = (prev >= 0) & (owner[np.maximum(prev, 0)] == owner)
+        prev = np.maximum(prev, 0)
+        # A negation right after an -ly adverb is used up by it ("really not very good")
+        absorbed = negation & ~known & has_prev & self.ly_modifier[ids[prev]]
+        before = np.r_[-1, np.maximum.accumulate(np.where(skipped, -1, positions))[:-1]]
+        has_before = (before >= 0) & (owner[np.maximum(before, 0)] == owner)
+        before = np.maximum(before, 0)
+        negation_before = has_before & negation[before] & ~absorbed[before]
+        
+        # Known word after a known adverb: scaled by its intensity and merged with it
+        after_modifier = known & has_prev & self.known[ids[prev]] & self.modifier[ids[prev]]
+        # A negation longer than two letters ends a non -ly adverb's reach ("very not good")
+        long_negations = np.cumsum(negation & (lengths > 2))
+        broken = long_negations[np.maximum(positions - 1, 0)] > long_negations[prev]
+        after_modifier &= ~(broken & ~self.ly_modifier[ids[prev]])
+        merged_into_next = np.zeros(len(ids), dtype=bool)
+        merged_into_next[prev[after_modifier]] = True
+        
+        # "not good" flips and halves the score; "not really good" also inverts the intensity
+        negated_modifier = after_modifier & negation_before[prev]
+        intensity = self.intensity[ids[prev]]
+        intensity = np.where(negated_modifier, 1.0 / intensity, intensity)
+        scores = np.where(after_modifier, np.clip(self.polarity[ids] * intensity, -1.0, 1.0), self.polarity[ids])
+        
+        # "!" boosts the last known word by 1.25, unless that word is an adverb later merged away
+        last_known = np.maximum.accumulate(np.where(known, positions, -1))
+        bangs = positions[np.array(exclamations)]
+        targets = last_known[bangs]
+        targets = targets[(targets >= 0) & (owner[np.maximum(targets, 0)] == owner[bangs])]
+        targets = targets[~merged_into_next[targets]]
+        boosts = np.bincount(targets, minlength=len(ids))
+        scores = np.where(boosts > 0, np.clip(scores * 1.25 ** boosts, -1.0, 1.0), scores)
+        
+        # An adverb followed by a negation ("really not ...") carries the negation itself
+        last = len(ids) - 1
+        following = np.minimum.accumulate(np.where(modifier_skipped, len(ids), positions)[::-1])[::-1]
+        after = np.minimum(np.r_[following[1:], len(ids)], last)
+        negation_after = (positions < after) & (owner[after] == owner) & negation[after]
+        negated = negation_before | negated_modifier | (known & self.ly_modifier[ids] & negation_after)
+        # A chain of adverbs forms one chunk, which carries the negation to its end
+        while True:
+            chained = negated | (after_modifier & negated[prev])
+            if (chained == negated).all():
+                break
+            negated = chained
+        scores = np.where(negated, scores * -0.5, scores)
+        
+        counted = known & ~merged_into_next
+        totals = np.bincount(owner[counted], weights=scores[counted], minlength=len(tokenized))
+        counts = np.bincount(owner[counted], minlength=len(tokenized))
+        return totals / np.maximum(counts, 1)
+
+SENTIMENT_LEXICON = SentimentLexicon() if SENTIMENT_ENGINE == "lexicon" else None
+
+def message_sentiment(message: str) -> float:
+    """Sentiment polarity of one message with the configured engine"""
+    if SENTIMENT_LEXICON is not None:
+        return float(SENTIMENT_LEXICON.score_batch([message])[0])
+    return TextBlob(message).sentiment.polarity
+
+def batch_sentiments(messages: List[str]) -> np.ndarray:
+    """Sentiment polarity of many messages, NaN where analysis fails"""
+    if SENTIMENT_LEXICON is not None:
+        return SENTIMENT_LEXICON.score_batch(messages)
+    return np.array([batch_sentiment(message) for message in messages], dtype=float)
+
+# Optional TF-IDF category model, trained offline by train_category_model.py
+CATEGORY_MODEL_PATH = os.getenv("CATEGORY_MODEL_PATH", "")
+CATEGORY_MODEL_THRESHOLD = float(os.getenv("CATEGORY_MODEL_THRESHOLD", "0.5"))
+
+class CategoryModel:
+    """TF-IDF features and per-category logistic regressions, scored as one sparse product"""
+    
+    def __init__(self, path: str):
+        model = joblib.load(path)
+        self.vectorizer = model["vectorizer"]
+        self.version = model["trained_at"]
+        
+        # Align model columns with CATEGORY_NAMES; categories the model was not trained on never fire
+        self.coef = np.zeros((len(self.vectorizer.vocabulary_), len(CATEGORY_NAMES)))
+        self.intercept = np.full(len(CATEGORY_NAMES), -50.0)
+        self.trained = np.zeros(len(CATEGORY_NAMES), dtype=bool)
+        for j, category in enumerate(model["categories"]):
+            if category in CATEGORIES:
+                k = CATEGORY_NAMES.index(category)
+                self.coef[:, k] = model["coef"][j]
+                self.intercept[k] = model["intercept"][j]
+                self.trained[k] = True
+        if not self.trained.any():
+            raise ValueError("model has no known categories")
+    
+    def predict_proba(self, messages: List[str]) -> np.ndarray:
+        """Per-category probabilities, one row per message"""
+        features = self.vectorizer.transform(messages)
+        return 1.0 / (1.0 + np.exp(-(features @ self.coef + self.intercept)))
+
+def load_category_model() -> Optional[CategoryModel]:
+    """Load the category model if one has been trained"""
+    if not CATEGORY_MODEL_PATH or not os.path.exists(CATEGORY_MODEL_PATH):
+        return None
+    try:
+        model = CategoryModel(CATEGORY_MODEL_PATH)
+        print(f"Loaded category model trained at {model.version}")
+        return model
+    except Exception as e:
+        print(f"Error loading category model: {e}")
+        return None
+
+CATEGORY_MODEL = load_category_model()
+
+def model_categories(messages: List[str]):
+    """Category hits, probabilities and confidence scores from the category model"""
+    probabilities = CATEGORY_MODEL.predict_proba(messages)
+    category_hits = probabilities >= CATEGORY_MODEL_THRESHOLD
+    # Confidence is how decisive the model is across the categories it was trained on
+    trained = probabilities[:, CATEGORY_MODEL.trained]
+    confidences = np.round(np.maximum(trained, 1.0 - trained).mean(axis=1), 3)
+    return category_hits, probabilities, confidences
+
+def probability_map(probabilities: np.ndarray) -> Dict[str, float]:
+    """Per-category probabilities keyed by category name"""
+    return {category: round(float(p), 3) for category, p in zip(CATEGORY_NAMES, probabilities)}
+
+# Analysis cache configuration
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "10000"))
+ANALYSIS_CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH", "")  # empty disables the disk tier
+
+# Part of every cache key; bump when analysis logic changes so stale results are not reused
+ANALYZER_VERSION = (
+    f"3-{SENTIMENT_ENGINE}"
+    + ("-word-boundary" if KEYWORD_WORD_BOUNDARY else "")
+    + (f"-model-{CATEGORY_MODEL.version}" if CATEGORY_MODEL else "")
+)
+
+def normalize_message(message: str) -> str:
+    """Normalize a commit message before analysis and caching"""
+    return message.replace("\r\n", "\n").strip()
+
+class AnalysisCache:
+    """LRU cache of analyses keyed by normalized message hash, with an optional SQLite tier.
+    
+    Entries are stored without processed_at; callers stamp it on the way out.
+    """
+    
+    # Keys per disk lookup query; SQLite caps the number of bound parameters
+    DISK_LOOKUP_BATCH = 500
+    
+    def __init__(self, max_entries: int, path: str = ""):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.path = path
+        self.local = threading.local()
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._connection().execute(
+                "CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, analysis TEXT NOT NULL) WITHOUT ROWID"
+            )
+    
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+    
+    @staticmethod
+    def _key(message: str) -> str:
+        return hashlib.sha256(f"{ANALYZER_VERSION}:{message}".encode()).hexdigest()
+    
+    def _remember(self, key: str, analysis: Dict[str, Any]):
+        self.entries[key] = analysis
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    async def get_many(self, messages: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Cached analyses of distinct normalized messages, None for misses.
+        
+        Memory misses are looked up on disk in one pass, off the event loop.
+        """
+        keys = {message: self._key(message) for message in messages}
+        found: Dict[str, Dict[str, Any]] = {}
+        for message, key in keys.items():
+            analysis = self.entries.get(key)
+            if analysis is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                found[message] = analysis
+        
+        missing = [message for message in keys if message not in found]
+        if self.path and missing:
+            loop = asyncio.get_running_loop()
+            stored = await loop.run_in_executor(None, self._read_disk, [keys[message] for message in missing])
+            for message in missing:
+                analysis = stored.get(keys[message])
+                if analysis is not None:
+                    self._remember(keys[message], analysis)
+                    self.disk_hits += 1
+                    found[message] = analysis
+        
+        self.misses += len(keys) - len(found)
+        return {message: found.get(message) for message in keys}
+    
+    async def put_many(self, analyses: Dict[str, Dict[str, Any]]):
+        """Store the analyses of normalized messages, writing the disk tier in one transaction"""
+        rows = [(self._key(message), analysis) for message, analysis in analyses.items()]
+        for key, analysis in rows:
+            self._remember(key, analysis)
+        if self.path and rows:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                None, self._write_disk, [(key, json.dumps(analysis)) for key, analysis in rows]
+            )
+    
+    def _read_disk(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        conn = self._connection()
+        stored = {}
+        for i in range(0, len(keys), self.DISK_LOOKUP_BATCH):
+            chunk = keys[i:i + self.DISK_LOOKUP_BATCH]
+            rows = conn.execute(
+                f"SELECT key, analysis FROM analyses WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            )
+            stored.update((key, json.loads(analysis)) for key, analysis in rows)
+        return stored
+    
+    def _write_disk(self, rows: List[tuple]):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT OR REPLACE INTO analyses (key, analysis) VALUES (?, ?)", rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        stats = {
+            "analyzer_version": ANALYZER_VERSION,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "disk_tier": bool(self.path)
+        }
+        if self.path:
+            stats["disk_entries"] = self._connection().execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+            stats["disk_bytes"] = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return stats
+
+analysis_cache = AnalysisCache(ANALYSIS_CACHE_MAX_ENTRIES, ANALYSIS_CACHE_PATH)
+
+# CPU-bound scoring runs in a process pool so the event loop stays responsive
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", str(os.cpu_count() or 1)))  # 0 scores in a thread instead
+ANALYSIS_CHUNK_SIZE = int(os.getenv("ANALYSIS_CHUNK_SIZE", "64"))
+
+analysis_pool: Optional[ProcessPoolExecutor] = None
+
+def warm_analysis_worker():
+    """Load the sentiment lexicon once per worker process"""
+    message_sentiment("warm up")
+
+@app.on_event("startup")
+async def startup_event():
+    """Start the analysis worker pool"""
+    global analysis_pool
+    if ANALYSIS_WORKERS > 0:
+        analysis_pool = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS, initializer=warm_analysis_worker)
+        # Start every worker now rather than on the first request
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(analysis_pool, warm_analysis_worker) for _ in range(ANALYSIS_WORKERS)))
+        print(f"Started {ANALYSIS_WORKERS} analysis workers")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the analysis worker pool"""
+    global analysis_pool
+    if analysis_pool is not None:
+        analysis_pool.shutdown(cancel_futures=True)
+        analysis_pool = None
+
 class CommitMessage(BaseModel):
     message: str
 
+class BatchAnalysisRequest(BaseModel):
+    messages: List[str]
+
 class CommitsRequest(BaseModel):
     commits: List[Dict[str, Any]]
 
@@ -65,6 +550,29 @@ async def analyze_commit(commit: CommitMessage):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+@app.post("/analyze-batch")
+async def analyze_batch(request: BatchAnalysisRequest):
+    """Analyze many commit messages in one request, results in input order"""
+    try:
+        analyses = await analyze_messages_batch(request.messages)
+        return {
+            "success": True,
+            "analyses": analyses,
+            "total": len(analyses),
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@app.get("/cache-stats")
+async def cache_stats():
+    """Analysis cache hit/miss statistics"""
+    return {
+        "success": True,
+        "cache": analysis_cache.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.post("/process-commits")
 async def process_commits(request: CommitsRequest):
     """Process multiple commits from GitHub service"""
@@ -81,12 +589,13 @@ async def process_commits(request: CommitsRequest):
                 "committed_at": commit_data["commit"]["author"]["date"]
             }
             
-            # Analyze with AI
-            ai_analysis = await analyze_commit_message(commit_info["message"])
-            commit_info["ai_analysis"] = ai_analysis
-            
             processed_commits.append(commit_info)
         
+        # Analyze all messages with AI in one batch
+        analyses = await analyze_messages_batch([commit["message"] for commit in processed_commits])
+        for commit_info, ai_analysis in zip(processed_commits, analyses):
+            commit_info["ai_analysis"] = ai_analysis
+        
         # Send processed commits to database service
         await send_to_database_service(processed_commits)
         
@@ -100,71 +609,181 @@ async def process_commits(request: CommitsRequest):
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 async def analyze_commit_message(message: str) -> Dict[str, Any]:
-    """Analyze commit message using AI/NLP"""
+    """Analyze commit message using AI/NLP, reusing cached results"""
+    message = normalize_message(message)
+    analysis = (await analysis_cache.get_many([message]))[message]
+    if analysis is None:
+        loop = asyncio.get_running_loop()
+        analysis = await loop.run_in_executor(analysis_pool, score_message, message)
+        if analysis is None:
+            return default_analysis(datetime.now().isoformat())
+        await analysis_cache.put_many({message: analysis})
+    
+    return {**analysis, "processed_at": datetime.now().isoformat()}
+
+def score_message(message: str) -> Optional[Dict[str, Any]]:
+    """Run the full analysis of one message, None when analysis fails"""
     try:
         # Sentiment analysis
-        blob = TextBlob(message)
-        sentiment = blob.sentiment.polarity
+        sentiment = message_sentiment(message)
+        
+        # Keyword hits from a single pass feed categories and priority
+        keyword_hits = KEYWORD_MATCHER.find(message.lower())
         
-        # Category detection
-        categories = detect_categories(message.lower())
+        # Category detection, from the trained model when one is loaded
+        probabilities = None
+        if CATEGORY_MODEL is not None:
+            category_hits, probabilities, confidences = model_categories([message])
+            categories = [CATEGORY_NAMES[j] for j in np.flatnonzero(category_hits[0])]
+        else:
+            categories = detect_categories(keyword_hits)
         
         # Priority assessment
-        priority = assess_priority(message, sentiment, categories)
+        priority = assess_priority(keyword_hits, sentiment, categories)
         
         # Confidence score
-        confidence = calculate_confidence(message, categories)
+        if probabilities is not None:
+            confidence = float(confidences[0])
+        else:
+            confidence = calculate_confidence(message, categories)
         
         # Generate insights
         insights = generate_insights(message, sentiment, categories)
         
-        return {
+        analysis = {
             "sentiment_score": round(sentiment, 3),
             "sentiment_label": get_sentiment_label(sentiment),
             "categories": categories,
             "priority": priority,
             "confidence_score": confidence,
             "insights": insights,
-            "processed_at": datetime.now().isoformat(),
             "analysis_type": "commit_message"
         }
+        if probabilities is not None:
+            analysis["category_probabilities"] = probability_map(probabilities[0])
+        return analysis
     except Exception as e:
         print(f"Error in AI analysis: {e}")
-        return {
-            "sentiment_score": 0.0,
-            "sentiment_label": "neutral",
-            "categories": [],
-            "priority": "normal",
-            "confidence_score": 0.0,
-            "insights": ["Analysis failed"],
-            "processed_at": datetime.now().isoformat(),
-            "analysis_type": "commit_message"
-        }
+        return None
 
-def detect_categories(message: str) -> list:
-    """Detect commit categories based on keywords"""
-    detected_categories = []
+async def analyze_messages_batch(messages: List[str]) -> List[Dict[str, Any]]:
+    """Analyze a batch of commit messages, scoring only distinct uncached messages"""
+    if not messages:
+        return []
     
-    for category, keywords in CATEGORIES.items():
-        for keyword in keywords:
-            if keyword in message:
-                detected_categories.append(category)
-                break
+    processed_at = datetime.now().isoformat()
+    normalized = [normalize_message(message) for message in messages]
     
-    return detected_categories
+    analyses = await analysis_cache.get_many(list(dict.fromkeys(normalized)))
+    misses = [message for message, analysis in analyses.items() if analysis is None]
+    
+    scored = dict(zip(misses, await score_messages_offloaded(misses)))
+    analyses.update(scored)
+    await analysis_cache.put_many({message: analysis for message, analysis in scored.items() if analysis is not None})
+    
+    return [
+        {**analyses[message], "processed_at": processed_at} if analyses[message] is not None
+        else default_analysis(processed_at)
+        for message in normalized
+    ]
 
-def assess_priority(message: str, sentiment: float, categories: list) -> str:
-    """Assess commit priority"""
-    high_priority_keywords = ["urgent", "critical", "fix", "bug", "security", "hotfix"]
-    high_priority_categories = ["bug_fix", "security"]
+async def score_messages_offloaded(messages: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """Score messages in chunks spread across the analysis workers"""
+    loop = asyncio.get_running_loop()
+    chunks = [messages[i:i + ANALYSIS_CHUNK_SIZE] for i in range(0, len(messages), ANALYSIS_CHUNK_SIZE)]
+    scored = await asyncio.gather(*(loop.run_in_executor(analysis_pool, score_messages_batch, chunk) for chunk in chunks))
+    return [analysis for chunk in scored for analysis in chunk]
+
+def score_messages_batch(messages: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """Score distinct messages with vectorized keyword scoring, None where analysis fails"""
+    if not messages:
+        return []
+    
+    sentiments = batch_sentiments(messages)
+    failed = np.isnan(sentiments)
+    sentiments = np.nan_to_num(sentiments)
+    
+    # Keyword hits: one row per message, one column per keyword
+    keyword_hits = np.zeros((len(messages), len(BATCH_KEYWORDS)), dtype=bool)
+    for i, message in enumerate(messages):
+        for keyword in KEYWORD_MATCHER.find(message.lower()):
+            keyword_hits[i, BATCH_KEYWORD_INDEX[keyword]] = True
+    probabilities = None
+    if CATEGORY_MODEL is not None:
+        category_hits, probabilities, confidences = model_categories(messages)
+    else:
+        category_hits = (keyword_hits.astype(np.int32) @ CATEGORY_MATRIX) > 0
+    
+    # Priority assessment
+    high_priority = keyword_hits[:, PRIORITY_KEYWORD_MASK].any(axis=1) | category_hits[:, PRIORITY_CATEGORY_MASK].any(axis=1)
+    negative = sentiments < -0.3
+    priorities = np.where(high_priority, "high", np.where(negative, "medium", "normal"))
+    
+    # Confidence score
+    if probabilities is None:
+        lengths = np.array([len(message) for message in messages])
+        issue_refs = np.array([bool(re.search(r'#[0-9]+', message)) for message in messages])
+        has_category = category_hits.any(axis=1)
+        confidences = np.minimum(0.5 + 0.2 * (lengths > 50) + 0.2 * has_category + 0.1 * issue_refs, 1.0)
+    
+    results: List[Optional[Dict[str, Any]]] = []
+    for i in range(len(messages)):
+        if failed[i]:
+            results.append(None)
+            continue
+        categories = [CATEGORY_NAMES[j] for j in np.flatnonzero(category_hits[i])]
+        sentiment = float(sentiments[i])
+        analysis = {
+            "sentiment_score": round(sentiment, 3),
+            "sentiment_label": get_sentiment_label(sentiment),
+            "categories": categories,
+            "priority": str(priorities[i]),
+            "confidence_score": float(confidences[i]),
+            "insights": generate_insights(messages[i], sentiment, categories),
+            "analysis_type": "commit_message"
+        }
+        if probabilities is not None:
+            analysis["category_probabilities"] = probability_map(probabilities[i])
+        results.append(analysis)
     
+    return results
+
+def batch_sentiment(message: str) -> float:
+    """Sentiment polarity for batch analysis, NaN when analysis fails"""
+    try:
+        return TextBlob(message).sentiment.polarity
+    except Exception as e:
+        print(f"Error in AI analysis: {e}")
+        return float("nan")
+
+def default_analysis(processed_at: str) -> Dict[str, Any]:
+    """Fallback analysis returned when a message cannot be analyzed"""
+    return {
+        "sentiment_score": 0.0,
+        "sentiment_label": "neutral",
+        "categories": [],
+        "priority": "normal",
+        "confidence_score": 0.0,
+        "insights": ["Analysis failed"],
+        "processed_at": processed_at,
+        "analysis_type": "commit_message"
+    }
+
+def detect_categories(keyword_hits: Set[str]) -> list:
+    """Detect commit categories from matched keywords"""
+    return [
+        category for category, keywords in CATEGORIES.items()
+        if any(keyword in keyword_hits for keyword in keywords)
+    ]
+
+def assess_priority(keyword_hits: Set[str], sentiment: float, categories: list) -> str:
+    """Assess commit priority"""
     # Check for high priority keywords
-    for keyword in high_priority_keywords:
-        if keyword in message.lower():
-            return "high"
+    if any(keyword in keyword_hits for keyword in HIGH_PRIORITY_KEYWORDS):
+        return "high"
     
     # Check for high priority categories
-    for category in high_priority_categories:
+    for category in HIGH_PRIORITY_CATEGORIES:
         if category in categories:
             return "high"
     
@@ -1,7 +1,16 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 import httpx
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime
+from typing import Dict, Optional, Set
 
 app = FastAPI(title="API Gateway", version="1.0.0")
 
@@ -20,6 +29,88 @@ AI_SERVICE_URL = "http://ai-service:8002"
 DATABASE_SERVICE_URL = "http://database-service:8003"
 GITHUB_ANALYSIS_SERVICE_URL = "http://github-analysis-service:8004"
 
+# Upstream HTTP client configuration
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "100"))
+UPSTREAM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30"))
+UPSTREAM_HTTP2 = os.getenv("UPSTREAM_HTTP2", "False").lower() == "true"
+
+# Per-upstream request timeouts in seconds
+UPSTREAM_TIMEOUTS = {
+    "github": float(os.getenv("GITHUB_SERVICE_TIMEOUT", "60")),
+    "ai": float(os.getenv("AI_SERVICE_TIMEOUT", "10")),
+    "database": float(os.getenv("DATABASE_SERVICE_TIMEOUT", "30")),
+    "github_analysis": float(os.getenv("GITHUB_ANALYSIS_SERVICE_TIMEOUT", "10"))
+}
+
+# Per-commit AI analysis fan-out in /track-now
+AI_ANALYSIS_CONCURRENCY = int(os.getenv("AI_ANALYSIS_CONCURRENCY", "10"))
+AI_ANALYSIS_TIMEOUT = float(os.getenv("AI_ANALYSIS_TIMEOUT", "10"))
+
+# /track-now single-flight: concurrent callers share one pipeline run, and
+# callers within the freshness window reuse the last successful result
+TRACK_NOW_FRESHNESS_SECONDS = float(os.getenv("TRACK_NOW_FRESHNESS_SECONDS", "5"))
+track_now_task: Optional[asyncio.Task] = None
+track_now_result: Optional[dict] = None
+track_now_completed_at = 0.0
+
+# Ingestion jobs: the pipeline runs in the background and reports per-stage progress
+INGEST_JOBS_RETAINED = int(os.getenv("INGEST_JOBS_RETAINED", "50"))
+ingest_jobs: "OrderedDict[str, dict]" = OrderedDict()
+track_now_job: Optional[dict] = None
+
+# Server-Sent Events push channel: one queue per connected /events client
+EVENTS_KEEPALIVE_SECONDS = float(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+# Background ingestion runs while at least one client is subscribed; 0 disables it
+INGEST_INTERVAL_SECONDS = float(os.getenv("INGEST_INTERVAL_SECONDS", "30"))
+event_subscribers: Set[asyncio.Queue] = set()
+ingestion_task: Optional[asyncio.Task] = None
+
+# Application-scoped HTTP clients, one per upstream service
+upstream_clients: Dict[str, httpx.AsyncClient] = {}
+
+def create_upstream_client(name: str) -> httpx.AsyncClient:
+    """Create a keep-alive HTTP client for an upstream service"""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(UPSTREAM_TIMEOUTS[name], connect=5.0),
+        limits=httpx.Limits(
+            max_connections=UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY
+        ),
+        http2=UPSTREAM_HTTP2
+    )
+
+def get_upstream_client(name: str) -> httpx.AsyncClient:
+    """Get the shared HTTP client for an upstream service"""
+    client = upstream_clients.get(name)
+    if client is None or client.is_closed:
+        client = create_upstream_client(name)
+        upstream_clients[name] = client
+    return client
+
+@app.on_event("startup")
+async def startup_event():
+    """Create shared upstream HTTP clients and start background ingestion"""
+    global ingestion_task
+    for name in UPSTREAM_TIMEOUTS:
+        get_upstream_client(name)
+    print(f"Upstream HTTP clients created (http2={UPSTREAM_HTTP2})")
+    
+    if INGEST_INTERVAL_SECONDS > 0:
+        ingestion_task = asyncio.create_task(run_ingestion_loop())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background ingestion and close shared upstream HTTP clients"""
+    if ingestion_task:
+        ingestion_task.cancel()
+    for client in upstream_clients.values():
+        await client.aclose()
+    upstream_clients.clear()
+    print("Upstream HTTP clients closed")
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -45,95 +136,377 @@ async def health_check():
     }
 
 @app.get("/track-now")
-async def track_now():
-    """Track Now endpoint - fetches fresh data from GitHub, processes with AI, and stores in database"""
+async def track_now(wait: bool = True):
+    """Track Now endpoint - fetches fresh data from GitHub, processes with AI, and stores in database.
+    
+    With wait=false the latest stored data is returned immediately while a
+    refresh job runs in the background.
+    """
+    if track_now_result is not None and time.monotonic() - track_now_completed_at < TRACK_NOW_FRESHNESS_SECONDS:
+        return dict(track_now_result)
+    
+    job = start_ingest_job()
+    if not wait:
+        db_response = await get_upstream_client("database").get(f"{DATABASE_SERVICE_URL}/track-now")
+        if db_response.status_code != 200:
+            raise HTTPException(status_code=500, detail="Failed to retrieve data from database")
+        result = db_response.json()
+        result["job_id"] = job["id"]
+        result["refreshing"] = True
+        return result
+    
+    # Shield the shared run so one disconnecting caller does not cancel it for the others
+    return dict(await asyncio.shield(track_now_task))
+
+@app.post("/ingest", status_code=202)
+async def ingest():
+    """Start an ingestion job (or join the running one) and return its id immediately"""
+    job = start_ingest_job()
+    return {
+        "success": True,
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": f"/jobs/{job['id']}"
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status and per-stage progress of an ingestion job"""
+    job = ingest_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, "job": job}
+
+def start_ingest_job() -> dict:
+    """Return the running ingestion job, starting a new one if none is running"""
+    global track_now_task, track_now_job
+    if track_now_task is None or track_now_task.done():
+        track_now_job = create_ingest_job()
+        track_now_task = asyncio.create_task(run_track_now_pipeline(track_now_job))
+        # Failures are recorded on the job; retrieve them so unawaited runs do not warn
+        track_now_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+    return track_now_job
+
+def create_ingest_job() -> dict:
+    """Register a new ingestion job, forgetting the oldest finished ones"""
+    job = {
+        "id": uuid.uuid4().hex,
+        "status": "running",
+        "stage": None,
+        "created_at": datetime.now().isoformat(),
+        "finished_at": None,
+        "elapsed_seconds": None,
+        "fetched": 0,
+        "analyzed": 0,
+        "stored": 0,
+        "stages": {},
+        "error": None
+    }
+    ingest_jobs[job["id"]] = job
+    for job_id in list(ingest_jobs):
+        if len(ingest_jobs) <= INGEST_JOBS_RETAINED:
+            break
+        if ingest_jobs[job_id]["status"] != "running":
+            del ingest_jobs[job_id]
+    return job
+
+def start_stage(job: dict, stage: str) -> float:
+    """Mark a pipeline stage as running; returns its start time"""
+    job["stage"] = stage
+    job["stages"][stage] = {"status": "running"}
+    return time.monotonic()
+
+def finish_stage(job: dict, stage: str, started: float, **counts):
+    """Mark a pipeline stage as completed with its timing and counts"""
+    job["stages"][stage].update(status="completed", seconds=round(time.monotonic() - started, 3), **counts)
+
+async def run_track_now_pipeline(job: dict) -> dict:
+    """Run the GitHub -> AI -> database pipeline once, recording progress on the job"""
+    global track_now_result, track_now_completed_at
+    job_started = time.monotonic()
     try:
-        async with httpx.AsyncClient() as client:
-            # Step 1: Fetch fresh commits from GitHub
-            print("Fetching fresh commits from GitHub...")
-            github_response = await client.get(f"{GITHUB_SERVICE_URL}/commits")
-            if github_response.status_code != 200:
-                raise HTTPException(status_code=500, detail="Failed to fetch from GitHub")
+        # Step 1: Fetch commits newer than the stored watermark from GitHub
+        print("Fetching fresh commits from GitHub...")
+        started = start_stage(job, "fetch")
+        github_response = await get_upstream_client("github").get(
+            f"{GITHUB_SERVICE_URL}/commits",
+            params=await get_fetch_watermark()
+        )
+        if github_response.status_code != 200:
+            raise HTTPException(status_code=500, detail="Failed to fetch from GitHub")
+        
+        github_data = github_response.json()
+        if not github_data.get("success"):
+            raise HTTPException(status_code=500, detail="GitHub service error")
+        
+        commits = github_data.get("commits", [])
+        job["fetched"] = len(commits)
+        finish_stage(job, "fetch", started, count=len(commits))
+        print(f"Fetched {len(commits)} commits from GitHub")
+        
+        # Step 2: Process commits with AI analysis
+        started = start_stage(job, "analyze")
+        if commits:
+            print("Processing commits with AI...")
+            if not await analyze_commits_batch(commits):
+                await analyze_commits_concurrently(commits)
+        job["analyzed"] = sum(1 for commit in commits if commit.get("ai_analysis"))
+        finish_stage(job, "analyze", started, count=job["analyzed"])
+        
+        # Step 3: Store commits in database
+        started = start_stage(job, "store")
+        store_counts = {}
+        if commits:
+            print("Storing commits in database...")
+            # Transform GitHub data to database format
+            db_commits = []
+            for commit in commits:
+                db_commit = {
+                    "commit_sha": commit.get("sha", ""),
+                    "message": commit.get("commit", {}).get("message", ""),
+                    "author": commit.get("commit", {}).get("author", {}).get("name", ""),
+                    "author_email": commit.get("commit", {}).get("author", {}).get("email", ""),
+                    "committed_at": commit.get("commit", {}).get("author", {}).get("date", ""),
+                    "ai_analysis": commit.get("ai_analysis", {}),
+                    "files": commit.get("files", [])
+                }
+                db_commits.append(db_commit)
             
-            github_data = github_response.json()
-            if not github_data.get("success"):
-                raise HTTPException(status_code=500, detail="GitHub service error")
-            
-            commits = github_data.get("commits", [])
-            print(f"Fetched {len(commits)} commits from GitHub")
+            # Store in database
+            db_response = await get_upstream_client("database").post(
+                f"{DATABASE_SERVICE_URL}/store-commits",
+                json={"commits": db_commits}
+            )
+            if db_response.status_code != 200:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Failed to store commits in database ({db_response.status_code}): {db_response.text}"
+                )
+            stored = db_response.json()
+            store_counts = {key: stored.get(key, 0) for key in ("inserted", "updated", "skipped")}
+            job["stored"] = store_counts["inserted"] + store_counts["updated"]
+        finish_stage(job, "store", started, count=job["stored"], **store_counts)
+        
+        # Step 4: Return fresh data from database
+        print("Retrieving fresh data from database...")
+        started = start_stage(job, "load")
+        db_response = await get_upstream_client("database").get(f"{DATABASE_SERVICE_URL}/track-now")
+        if db_response.status_code == 200:
+            result = db_response.json()
+            result["message"] = f"Successfully fetched {len(commits)} fresh commits from GitHub and stored in database"
+            result["source"] = "github_api_fresh"
+            result["job_id"] = job["id"]
+            track_now_result = result
+            track_now_completed_at = time.monotonic()
+            finish_stage(job, "load", started, count=len(result.get("commits", [])))
             
-            # Step 2: Process commits with AI analysis
+            # Push the commits stored by this run to /events subscribers
             if commits:
-                print("Processing commits with AI...")
-                for commit in commits:
-                    try:
-                        # Analyze commit message
-                        ai_response = await client.post(
-                            f"{AI_SERVICE_URL}/analyze", 
-                            json={"message": commit.get("commit", {}).get("message", "")}
-                        )
-                        if ai_response.status_code == 200:
-                            ai_data = ai_response.json()
-                            # Extract just the analysis part from the AI response
-                            if ai_data.get("success") and ai_data.get("analysis"):
-                                commit["ai_analysis"] = ai_data["analysis"]
-                            else:
-                                commit["ai_analysis"] = ai_data
-                    except Exception as e:
-                        print(f"Error analyzing commit {commit.get('sha', 'unknown')}: {e}")
-                        commit["ai_analysis"] = {}
+                fetched_shas = {commit.get("sha") for commit in commits}
+                stored = [commit for commit in result.get("commits", []) if commit.get("commit_sha") in fetched_shas]
+                if stored:
+                    publish_event("commits", {"commits": stored, "total_commits": result.get("total_commits")})
             
-            # Step 3: Store commits in database
-            if commits:
-                print("Storing commits in database...")
-                # Transform GitHub data to database format
-                db_commits = []
-                for commit in commits:
-                    db_commit = {
-                        "commit_sha": commit.get("sha", ""),
-                        "message": commit.get("commit", {}).get("message", ""),
-                        "author": commit.get("commit", {}).get("author", {}).get("name", ""),
-                        "author_email": commit.get("commit", {}).get("author", {}).get("email", ""),
-                        "committed_at": commit.get("commit", {}).get("author", {}).get("date", ""),
-                        "ai_analysis": commit.get("ai_analysis", {}),
-                        "files": commit.get("files", [])
-                    }
-                    db_commits.append(db_commit)
-                
-                # Store in database
-                db_response = await client.post(
-                    f"{DATABASE_SERVICE_URL}/store-commits",
-                    json={"commits": db_commits}
-                )
-                if db_response.status_code != 200:
-                    print(f"Warning: Failed to store commits in database: {db_response.text}")
+            job["status"] = "succeeded"
+            return result
+        else:
+            raise HTTPException(status_code=500, detail="Failed to retrieve data from database")
             
-            # Step 4: Return fresh data from database
-            print("Retrieving fresh data from database...")
-            db_response = await client.get(f"{DATABASE_SERVICE_URL}/track-now")
-            if db_response.status_code == 200:
-                result = db_response.json()
-                result["message"] = f"Successfully fetched {len(commits)} fresh commits from GitHub and stored in database"
-                result["source"] = "github_api_fresh"
-                return result
-            else:
-                raise HTTPException(status_code=500, detail="Failed to retrieve data from database")
-                
     except Exception as e:
         print(f"Error in track_now: {e}")
+        job["status"] = "failed"
+        job["error"] = e.detail if isinstance(e, HTTPException) else str(e)
+        if job["stage"]:
+            job["stages"][job["stage"]]["status"] = "failed"
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+    finally:
+        if job["status"] == "running":
+            job["status"] = "cancelled"
+        job["finished_at"] = datetime.now().isoformat()
+        job["elapsed_seconds"] = round(time.monotonic() - job_started, 3)
+
+@app.get("/events")
+async def events(request: Request):
+    """Server-Sent Events stream of newly stored or re-analyzed commits"""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+    event_subscribers.add(queue)
+    
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=EVENTS_KEEPALIVE_SECONDS)
+                    yield message
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+        finally:
+            event_subscribers.discard(queue)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def publish_event(event: str, data: dict):
+    """Send an event to every /events subscriber, dropping it for slow ones"""
+    message = f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+    for queue in list(event_subscribers):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            print("Dropping event for slow /events subscriber")
+
+async def run_ingestion_loop():
+    """Run the ingestion pipeline periodically while /events has subscribers"""
+    while True:
+        await asyncio.sleep(INGEST_INTERVAL_SECONDS)
+        if not event_subscribers:
+            continue
+        try:
+            await track_now()
+        except Exception as e:
+            print(f"Error in background ingestion: {e}")
+
+async def get_fetch_watermark() -> dict:
+    """Get incremental fetch parameters from the database service watermark"""
+    try:
+        response = await get_upstream_client("database").get(f"{DATABASE_SERVICE_URL}/watermark")
+        if response.status_code != 200:
+            return {}
+        watermark = response.json()
+        params = {}
+        if watermark.get("last_commit_at"):
+            params["since"] = watermark["last_commit_at"]
+        if watermark.get("last_commit_sha"):
+            params["last_sha"] = watermark["last_commit_sha"]
+        return params
+    except Exception as e:
+        print(f"Error getting fetch watermark, fetching latest commits: {e!r}")
+        return {}
+
+async def analyze_commits_batch(commits: list) -> bool:
+    """Analyze all commit messages in one ai-service round trip"""
+    try:
+        ai_response = await get_upstream_client("ai").post(
+            f"{AI_SERVICE_URL}/analyze-batch",
+            json={"messages": [commit.get("commit", {}).get("message", "") for commit in commits]}
+        )
+        if ai_response.status_code != 200:
+            print(f"Batch AI analysis unavailable ({ai_response.status_code}), falling back to per-commit analysis")
+            return False
+        
+        analyses = ai_response.json().get("analyses", [])
+        if len(analyses) != len(commits):
+            print("Batch AI analysis returned a mismatched result count, falling back to per-commit analysis")
+            return False
+        
+        for commit, analysis in zip(commits, analyses):
+            commit["ai_analysis"] = analysis
+        return True
+    except Exception as e:
+        print(f"Error in batch AI analysis, falling back to per-commit analysis: {e!r}")
+        return False
+
+async def analyze_commit_with_ai(commit: dict, semaphore: asyncio.Semaphore):
+    """Analyze a single commit message, leaving empty analysis on failure"""
+    async with semaphore:
+        try:
+            # Analyze commit message
+            ai_response = await asyncio.wait_for(
+                get_upstream_client("ai").post(
+                    f"{AI_SERVICE_URL}/analyze",
+                    json={"message": commit.get("commit", {}).get("message", "")}
+                ),
+                timeout=AI_ANALYSIS_TIMEOUT
+            )
+            if ai_response.status_code == 200:
+                ai_data = ai_response.json()
+                # Extract just the analysis part from the AI response
+                if ai_data.get("success") and ai_data.get("analysis"):
+                    commit["ai_analysis"] = ai_data["analysis"]
+                else:
+                    commit["ai_analysis"] = ai_data
+        except Exception as e:
+            print(f"Error analyzing commit {commit.get('sha', 'unknown')}: {e!r}")
+            commit["ai_analysis"] = {}
+
+async def analyze_commits_concurrently(commits: list):
+    """Analyze commits concurrently, bounded by AI_ANALYSIS_CONCURRENCY"""
+    semaphore = asyncio.Semaphore(max(AI_ANALYSIS_CONCURRENCY, 1))
+    await asyncio.gather(*(analyze_commit_with_ai(commit, semaphore) for commit in commits))
+    failed = sum(1 for commit in commits if commit.get("ai_analysis") == {})
+    if failed:
+        print(f"AI analysis failed for {failed} of {len(commits)} commits")
 
 @app.get("/commits")
-async def get_commits(limit: int = 50, repository: str = None):
-    """Get commits - routes to database service"""
+async def get_commits(limit: int = Query(50, ge=1), repository: str = None, cursor: str = None):
+    """Get commits - routes to database service; pass next_cursor back as cursor for the next page"""
     try:
         params = {"limit": limit}
         if repository:
             params["repository"] = repository
+        if cursor:
+            params["cursor"] = cursor
             
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{DATABASE_SERVICE_URL}/commits", params=params)
-            return response.json()
+        response = await get_upstream_client("database").get(f"{DATABASE_SERVICE_URL}/commits", params=params)
+        if response.status_code == 400:
+            raise HTTPException(status_code=400, detail=response.json().get("detail", "Bad request"))
+        return response.json()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@app.get("/commits/changes")
+async def get_commits_changes(since: str = None, limit: int = Query(100, ge=1), repository: str = None):
+    """Commits inserted or re-analyzed after a cursor - routes to database service"""
+    try:
+        params = {"limit": limit}
+        if since:
+            params["since"] = since
+        if repository:
+            params["repository"] = repository
+        
+        response = await get_upstream_client("database").get(f"{DATABASE_SERVICE_URL}/commits/changes", params=params)
+        if response.status_code == 400:
+            raise HTTPException(status_code=400, detail=response.json().get("detail", "Bad request"))
+        return response.json()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@app.get("/commits/{commit_id}/files/{file_id}/patch")
+async def get_file_patch(commit_id: int, file_id: int, request: Request):
+    """Patch of one commit file, fetched on demand - routes to database service with Range passthrough"""
+    try:
+        headers = {"Range": request.headers["range"]} if "range" in request.headers else {}
+        client = get_upstream_client("database")
+        upstream_request = client.build_request(
+            "GET", f"{DATABASE_SERVICE_URL}/commits/{commit_id}/files/{file_id}/patch", headers=headers
+        )
+        # Stream the body through instead of buffering the whole patch
+        response = await client.send(upstream_request, stream=True)
+        if response.status_code == 404:
+            await response.aclose()
+            raise HTTPException(status_code=404, detail="File not found")
+        passthrough = {
+            name: response.headers[name]
+            for name in ("accept-ranges", "content-range", "content-length")
+            if name in response.headers
+        }
+        return StreamingResponse(
+            response.aiter_bytes(),
+            status_code=response.status_code,
+            media_type=response.headers.get("content-type", "text/plain; charset=utf-8"),
+            headers=passthrough,
+            background=BackgroundTask(response.aclose)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
@@ -141,9 +514,8 @@ async def get_commits(limit: int = 50, repository: str = None):
 async def fetch_commits():
     """Fetch commits - routes to GitHub service"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{GITHUB_SERVICE_URL}/fetch-commits")
-            return response.json()
+        response = await get_upstream_client("github").post(f"{GITHUB_SERVICE_URL}/fetch-commits")
+        return response.json()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
@@ -151,9 +523,8 @@ async def fetch_commits():
 async def get_stats():
     """Get statistics - routes to database service"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{DATABASE_SERVICE_URL}/stats")
-            return response.json()
+        response = await get_upstream_client("database").get(f"{DATABASE_SERVICE_URL}/stats")
+        return response.json()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
@@ -161,9 +532,8 @@ async def get_stats():
 async def analyze_commit(message: str):
     """Analyze commit - routes to AI service"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{AI_SERVICE_URL}/analyze", json={"message": message})
-            return response.json()
+        response = await get_upstream_client("ai").post(f"{AI_SERVICE_URL}/analyze", json={"message": message})
+        return response.json()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
@@ -171,9 +541,8 @@ async def analyze_commit(message: str):
 async def analyze_hash(commit_data: dict):
     """Analyze commit hash - routes to GitHub Analysis service"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{GITHUB_ANALYSIS_SERVICE_URL}/analyze-hash", json=commit_data)
-            return response.json()
+        response = await get_upstream_client("github_analysis").post(f"{GITHUB_ANALYSIS_SERVICE_URL}/analyze-hash", json=commit_data)
+        return response.json()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
@@ -181,9 +550,8 @@ async def analyze_hash(commit_data: dict):
 async def get_hash_stats():
     """Get hash analysis statistics - routes to GitHub Analysis service"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{GITHUB_ANALYSIS_SERVICE_URL}/hash-stats")
-            return response.json()
+        response = await get_upstream_client("github_analysis").get(f"{GITHUB_ANALYSIS_SERVICE_URL}/hash-stats")
+        return response.json()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
@@ -14,6 +14,9 @@ CREATE SCHEMA IF NOT EXISTS track_project;
 -- Set the search path to use track_project schema
 SET search_path TO track_project, public;
 
+-- Change positions for delta sync: bumped on insert and on re-analysis
+CREATE SEQUENCE track_project.commit_change_seq;
+
 -- Commits table in track_project schema
 CREATE TABLE track_project.commits (
     id SERIAL PRIMARY KEY,
@@ -28,9 +31,23 @@ CREATE TABLE track_project.commits (
     committed_at TIMESTAMP,
     ai_processed BOOLEAN DEFAULT FALSE,
     ai_analysis JSON,
-    event_status VARCHAR(50) DEFAULT 'pending'
+    event_status VARCHAR(50) DEFAULT 'pending',
+    change_seq BIGINT NOT NULL DEFAULT nextval('track_project.commit_change_seq'),
+    change_xid XID8 NOT NULL DEFAULT pg_current_xact_id() -- writing transaction, orders the delta feed
 );
 
+-- Patch bodies, deduplicated by content hash and stored compressed
+CREATE TABLE track_project.patch_blobs (
+    id BIGSERIAL PRIMARY KEY,
+    content_hash VARCHAR(64) UNIQUE NOT NULL, -- sha256 of the uncompressed patch
+    compression VARCHAR(10) NOT NULL DEFAULT 'zlib',
+    size INTEGER NOT NULL, -- uncompressed bytes
+    data BYTEA NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+-- Already compressed: keep TOAST from trying pglz again
+ALTER TABLE track_project.patch_blobs ALTER COLUMN data SET STORAGE EXTERNAL;
+
 -- Commit Files table in track_project schema
 CREATE TABLE track_project.commit_files (
     id SERIAL PRIMARY KEY,
@@ -42,7 +59,9 @@ CREATE TABLE track_project.commit_files (
     additions INTEGER DEFAULT 0,
     deletions INTEGER DEFAULT 0,
     changes INTEGER DEFAULT 0,
-    patch TEXT,
+    patch TEXT, -- legacy inline patch; new rows use patch_blob_id
+    patch_blob_id BIGINT REFERENCES track_project.patch_blobs(id),
+    patch_size INTEGER DEFAULT 0, -- bytes, so lists can show sizes without loading patches
     created_at TIMESTAMP DEFAULT NOW()
 );
 
@@ -62,18 +81,37 @@ CREATE TABLE track_project.tracking_config (
     repository VARCHAR(255) UNIQUE NOT NULL,
     enabled BOOLEAN DEFAULT TRUE,
     last_checked TIMESTAMP,
+    last_commit_sha VARCHAR(255), -- newest stored commit, watermark for incremental fetching
+    last_commit_at TIMESTAMP, -- commit time of last_commit_sha in UTC
     check_interval INTEGER DEFAULT 300,
     created_at TIMESTAMP DEFAULT NOW()
 );
 
+-- Per-repository rollup behind /stats, kept current by the triggers below.
+-- Commits without a repository are counted under ''.
+CREATE TABLE track_project.repo_stats (
+    repository VARCHAR(255) PRIMARY KEY,
+    total_commits BIGINT NOT NULL DEFAULT 0,
+    ai_processed_commits BIGINT NOT NULL DEFAULT 0,
+    first_commit_at TIMESTAMP,
+    last_commit_at TIMESTAMP, -- deletes do not narrow the range until a rebuild
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
 -- Create indexes for performance in track_project schema
 CREATE INDEX idx_commits_hash_key ON track_project.commits(hash_key);
 CREATE INDEX idx_commits_created_at ON track_project.commits(created_at);
 CREATE INDEX idx_commits_status ON track_project.commits(event_status);
 CREATE INDEX idx_commits_repository ON track_project.commits(repository);
+-- Keyset pagination on (created_at, id), with and without a repository filter
+CREATE INDEX idx_commits_created_at_id ON track_project.commits(created_at DESC, id DESC);
+CREATE INDEX idx_commits_repository_created_at_id ON track_project.commits(repository, created_at DESC, id DESC);
+-- Delta sync reads changes in (writing transaction, sequence) order
+CREATE INDEX idx_commits_change_xid_seq ON track_project.commits(change_xid, change_seq);
 CREATE INDEX idx_commit_files_commit_id ON track_project.commit_files(commit_id);
 CREATE INDEX idx_commit_files_file_path ON track_project.commit_files(file_path);
 CREATE INDEX idx_commit_files_change_type ON track_project.commit_files(change_type);
+CREATE INDEX idx_commit_files_patch_blob_id ON track_project.commit_files(patch_blob_id);
 CREATE INDEX idx_ai_analysis_commit_id ON track_project.ai_analysis(commit_id);
 CREATE INDEX idx_tracking_config_repository ON track_project.tracking_config(repository);
 
@@ -81,3 +119,75 @@ CREATE INDEX idx_tracking_config_repository ON track_project.tracking_config(rep
 INSERT INTO track_project.tracking_config (repository, enabled, check_interval) 
 VALUES ('jafar90147677/Ai-Agent', TRUE, 300)
 ON CONFLICT (repository) DO NOTHING;
+
+-- Statement-level triggers fold each write's transition table into repo_stats
+CREATE OR REPLACE FUNCTION track_project.repo_stats_on_insert() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO track_project.repo_stats AS s (
+        repository, total_commits, ai_processed_commits, first_commit_at, last_commit_at
+    )
+    SELECT COALESCE(repository, ''), COUNT(*), COUNT(*) FILTER (WHERE ai_processed),
+           MIN(committed_at), MAX(committed_at)
+    FROM new_commits
+    GROUP BY 1
+    ON CONFLICT (repository) DO UPDATE SET
+        total_commits = s.total_commits + EXCLUDED.total_commits,
+        ai_processed_commits = s.ai_processed_commits + EXCLUDED.ai_processed_commits,
+        first_commit_at = LEAST(s.first_commit_at, EXCLUDED.first_commit_at),
+        last_commit_at = GREATEST(s.last_commit_at, EXCLUDED.last_commit_at),
+        updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION track_project.repo_stats_on_update() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO track_project.repo_stats AS s (
+        repository, total_commits, ai_processed_commits, first_commit_at, last_commit_at
+    )
+    SELECT repository, SUM(total), SUM(processed), MIN(committed_at), MAX(committed_at)
+    FROM (
+        SELECT COALESCE(repository, '') AS repository, 1 AS total,
+               CASE WHEN ai_processed THEN 1 ELSE 0 END AS processed, committed_at
+        FROM new_commits
+        UNION ALL
+        SELECT COALESCE(repository, ''), -1, CASE WHEN ai_processed THEN -1 ELSE 0 END, NULL
+        FROM old_commits
+    ) AS delta
+    GROUP BY repository
+    ON CONFLICT (repository) DO UPDATE SET
+        total_commits = s.total_commits + EXCLUDED.total_commits,
+        ai_processed_commits = s.ai_processed_commits + EXCLUDED.ai_processed_commits,
+        first_commit_at = LEAST(s.first_commit_at, EXCLUDED.first_commit_at),
+        last_commit_at = GREATEST(s.last_commit_at, EXCLUDED.last_commit_at),
+        updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION track_project.repo_stats_on_delete() RETURNS trigger AS $$
+BEGIN
+    UPDATE track_project.repo_stats AS s SET
+        total_commits = s.total_commits - d.total,
+        ai_processed_commits = s.ai_processed_commits - d.processed,
+        updated_at = NOW()
+    FROM (
+        SELECT COALESCE(repository, '') AS repository, COUNT(*) AS total,
+               COUNT(*) FILTER (WHERE ai_processed) AS processed
+        FROM old_commits
+        GROUP BY 1
+    ) AS d
+    WHERE s.repository = d.repository;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER commits_repo_stats_insert AFTER INSERT ON track_project.commits
+    REFERENCING NEW TABLE AS new_commits
+    FOR EACH STATEMENT EXECUTE FUNCTION track_project.repo_stats_on_insert();
+CREATE TRIGGER commits_repo_stats_update AFTER UPDATE ON track_project.commits
+    REFERENCING OLD TABLE AS old_commits NEW TABLE AS new_commits
+    FOR EACH STATEMENT EXECUTE FUNCTION track_project.repo_stats_on_update();
+CREATE TRIGGER commits_repo_stats_delete AFTER DELETE ON track_project.commits
+    REFERENCING OLD TABLE AS old_commits
+    FOR EACH STATEMENT EXECUTE FUNCTION track_project.repo_stats_on_delete();
@@ -2,10 +2,12 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import hashlib
-import time
-import random
+import math
+import os
+import sqlite3
+import threading
 # import json  # Unused import removed
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any
 from datetime import datetime
 # import aiohttp  # Unused import removed
 
@@ -20,8 +22,149 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Store used hash keys to prevent duplicates
-used_hash_keys: Set[str] = set()
+# Duplicate registry configuration
+DUPLICATE_REGISTRY_BACKEND = os.getenv("DUPLICATE_REGISTRY_BACKEND", "memory")  # "memory" or "sqlite"
+DUPLICATE_REGISTRY_CAPACITY = int(os.getenv("DUPLICATE_REGISTRY_CAPACITY", "1000000"))
+DUPLICATE_REGISTRY_FP_RATE = float(os.getenv("DUPLICATE_REGISTRY_FP_RATE", "0.001"))
+DUPLICATE_REGISTRY_PATH = os.getenv("DUPLICATE_REGISTRY_PATH", "/app/data/hash_registry.db")
+
+def fingerprint64(key: str) -> int:
+    """Signed 64-bit fingerprint of a key"""
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], "big", signed=True)
+
+class BloomDuplicateRegistry:
+    """In-memory Bloom filter sized for a capacity and false-positive rate.
+    
+    Memory is fixed at construction; past capacity the false-positive rate
+    rises instead of memory growing.
+    """
+    
+    def __init__(self, capacity: int, fp_rate: float):
+        self.capacity = max(capacity, 1)
+        self.fp_rate = fp_rate
+        self.num_bits = max(int(-self.capacity * math.log(fp_rate) / (math.log(2) ** 2)), 8)
+        self.num_hashes = max(int(round(self.num_bits / self.capacity * math.log(2))), 1)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self.lock = threading.Lock()
+    
+    def _positions(self, key: str):
+        digest = hashlib.sha256(key.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+    
+    def add(self, key: str) -> bool:
+        """Register a key; returns False if it was (probably) already present"""
+        positions = self._positions(key)
+        with self.lock:
+            if all(self.bits[p >> 3] & (1 << (p & 7)) for p in positions):
+                return False
+            for p in positions:
+                self.bits[p >> 3] |= 1 << (p & 7)
+            self.count += 1
+            return True
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def clear(self):
+        with self.lock:
+            self.bits = bytearray(len(self.bits))
+            self.count = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "entries": self.count,
+            "capacity": self.capacity,
+            "memory_bytes": len(self.bits),
+            "hash_functions": self.num_hashes,
+            "estimated_fp_rate": (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+        }
+
+class SQLiteDuplicateRegistry:
+    """Persistent registry of 64-bit fingerprints in SQLite, shared by all workers"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.local = threading.local()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("CREATE TABLE IF NOT EXISTS fingerprints (fp INTEGER PRIMARY KEY) WITHOUT ROWID")
+            # Running entry count, so health checks do not scan the fingerprint table
+            conn.execute("CREATE TABLE IF NOT EXISTS registry_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute(
+                "INSERT OR IGNORE INTO registry_meta (key, value) "
+                "SELECT 'entries', COUNT(*) FROM fingerprints"
+            )
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS fingerprints_count AFTER INSERT ON fingerprints
+                BEGIN
+                    UPDATE registry_meta SET value = value + 1 WHERE key = 'entries';
+                END
+            """)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+    
+    def add(self, key: str) -> bool:
+        """Register a key; returns False if its fingerprint was already present"""
+        cursor = self._connection().execute(
+            "INSERT OR IGNORE INTO fingerprints (fp) VALUES (?)", (fingerprint64(key),)
+        )
+        return cursor.rowcount == 1
+    
+    def __len__(self) -> int:
+        return self._connection().execute(
+            "SELECT value FROM registry_meta WHERE key = 'entries'"
+        ).fetchone()[0]
+    
+    def clear(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM fingerprints")
+            conn.execute("UPDATE registry_meta SET value = 0 WHERE key = 'entries'")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def stats(self) -> Dict[str, Any]:
+        entries = len(self)
+        return {
+            "backend": "sqlite",
+            "entries": entries,
+            "path": self.path,
+            # Recent inserts live in the write-ahead log until a checkpoint
+            "disk_bytes": sum(
+                os.path.getsize(path) for path in (self.path, f"{self.path}-wal") if os.path.exists(path)
+            ),
+            # Birthday bound for a new key colliding with any stored 64-bit fingerprint
+            "estimated_fp_rate": entries / 2 ** 64
+        }
+
+def create_duplicate_registry():
+    """Create the configured duplicate registry backend"""
+    if DUPLICATE_REGISTRY_BACKEND == "sqlite":
+        return SQLiteDuplicateRegistry(DUPLICATE_REGISTRY_PATH)
+    return BloomDuplicateRegistry(DUPLICATE_REGISTRY_CAPACITY, DUPLICATE_REGISTRY_FP_RATE)
+
+# Registry of analyzed commits to detect duplicates
+duplicate_registry = create_duplicate_registry()
 
 class CommitAnalysisRequest(BaseModel):
     commit_sha: str
@@ -42,7 +185,7 @@ async def root():
         "message": "GitHub Analysis Service",
         "status": "running",
         "timestamp": datetime.now().isoformat(),
-        "total_hashes_analyzed": len(used_hash_keys)
+        "total_hashes_analyzed": len(duplicate_registry)
     }
 
 @app.get("/health")
@@ -52,7 +195,7 @@ async def health_check():
         "status": "healthy",
         "service": "github-analysis-service",
         "timestamp": datetime.now().isoformat(),
-        "unique_hashes": len(used_hash_keys)
+        "unique_hashes": len(duplicate_registry)
     }
 
 @app.post("/analyze-hash")
@@ -62,12 +205,8 @@ async def analyze_hash(request: CommitAnalysisRequest):
         # Generate unique hash key
         hash_key = generate_unique_hash(request.commit_sha, request.repository)
         
-        # Check if hash already exists
-        is_duplicate = hash_key in used_hash_keys
-        
-        if not is_duplicate:
-            # Add to used hashes
-            used_hash_keys.add(hash_key)
+        # Register hash, detecting duplicates
+        is_duplicate = not duplicate_registry.add(hash_key)
         
         # Perform hash analysis
         analysis = analyze_commit_hash(request.commit_sha, request.message, hash_key)
@@ -92,12 +231,8 @@ async def analyze_commits(commits: List[CommitAnalysisRequest]):
             # Generate unique hash key
             hash_key = generate_unique_hash(commit.commit_sha, commit.repository)
             
-            # Check if hash already exists
-            is_duplicate = hash_key in used_hash_keys
-            
-            if not is_duplicate:
-                # Add to used hashes
-                used_hash_keys.add(hash_key)
+            # Register hash, detecting duplicates
+            is_duplicate = not duplicate_registry.add(hash_key)
             
             # Perform hash analysis
             analysis = analyze_commit_hash(commit.commit_sha, commit.message, hash_key)
@@ -113,7 +248,7 @@ async def analyze_commits(commits: List[CommitAnalysisRequest]):
             "success": True,
             "results": results,
             "total_analyzed": len(results),
-            "unique_hashes": len(used_hash_keys),
+            "unique_hashes": len(duplicate_registry),
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
@@ -122,38 +257,27 @@ async def analyze_commits(commits: List[CommitAnalysisRequest]):
 @app.get("/hash-stats")
 async def get_hash_stats():
     """Get hash analysis statistics"""
+    registry_stats = duplicate_registry.stats()
     return {
         "success": True,
-        "total_unique_hashes": len(used_hash_keys),
+        "total_unique_hashes": registry_stats["entries"],
         "hash_analysis_stats": {
-            "total_analyzed": len(used_hash_keys),
-            "duplicate_prevented": len(used_hash_keys),  # All stored are unique
+            "total_analyzed": registry_stats["entries"],
+            "duplicate_prevented": registry_stats["entries"],  # All stored are unique
             "hash_generation_time": "~1ms per hash"
         },
+        "registry": registry_stats,
         "timestamp": datetime.now().isoformat()
     }
 
 def generate_unique_hash(commit_sha: str, repository: str) -> str:
-    """Generate unique hash key for commit"""
-    timestamp = int(time.time() * 1000)
-    random_num = random.randint(1000, 9999)
-    
-    # Create hash input with multiple components
-    hash_input = f"{commit_sha}_{repository}_{timestamp}_{random_num}"
-    
-    # Generate SHA256 hash
-    hash_key = hashlib.sha256(hash_input.encode()).hexdigest()
-    
-    # Ensure uniqueness (in case of collision)
-    counter = 0
-    original_hash = hash_key
-    
-    while hash_key in used_hash_keys:
-        counter += 1
-        hash_input = f"{original_hash}_{counter}"
-        hash_key = hashlib.sha256(hash_input.encode()).hexdigest()
+    """Generate deterministic hash key for commit.
     
-    return hash_key
+    The same (repository, commit SHA) always maps to the same key, which is
+    what lets the duplicate registry recognise a commit seen before.
+    """
+    hash_input = f"{repository}:{commit_sha}"
+    return hashlib.sha256(hash_input.encode()).hexdigest()
 
 def analyze_commit_hash(commit_sha: str, message: str, hash_key: str) -> Dict[str, Any]:
     """Analyze commit hash and provide insights"""
@@ -226,9 +350,8 @@ def classify_message_type(message: str) -> str:
 @app.get("/clear-hashes")
 async def clear_hashes():
     """Clear all stored hash keys (for testing)"""
-    global used_hash_keys
-    count = len(used_hash_keys)
-    used_hash_keys.clear()
+    count = len(duplicate_registry)
+    duplicate_registry.clear()
     
     return {
         "success": True,
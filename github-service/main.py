@@ -4,8 +4,10 @@ import aiohttp
 import asyncio
 import os
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import json
+import re
+from collections import OrderedDict
 
 from dotenv import load_dotenv
 
@@ -26,6 +28,18 @@ app.add_middleware(
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
 GITHUB_REPO = os.getenv("GITHUB_REPO", "your-username/your-repo")
 BASE_URL = "https://api.github.com"
+GITHUB_COMMIT_LIMIT = int(os.getenv("GITHUB_COMMIT_LIMIT", "10"))
+GITHUB_DETAIL_CONCURRENCY = int(os.getenv("GITHUB_DETAIL_CONCURRENCY", "10"))
+# Upper bound on commit list pages followed to reach a watermark
+GITHUB_MAX_PAGES = int(os.getenv("GITHUB_MAX_PAGES", "20"))
+
+# Conditional-request cache for GitHub API responses
+GITHUB_CACHE_DIR = os.getenv("GITHUB_CACHE_DIR", "/app/data/github_cache")
+GITHUB_CACHE_MAX_ENTRIES = int(os.getenv("GITHUB_CACHE_MAX_ENTRIES", "500"))
+FULL_SHA_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+
+# URL -> {"etag", "last_modified", "body", "next_url"}, least recently used first
+response_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
 
 @app.get("/")
 async def root():
@@ -46,8 +60,12 @@ async def health_check():
     }
 
 @app.get("/commits")
-async def get_commits():
-    """Get commits from GitHub"""
+async def get_commits(limit: Optional[int] = None, since: Optional[str] = None, last_sha: Optional[str] = None):
+    """Get commits from GitHub.
+    
+    With a watermark (``since`` timestamp and/or ``last_sha``) only commits newer
+    than the watermark are returned, oldest first up to ``limit``.
+    """
     if not GITHUB_TOKEN:
         raise HTTPException(status_code=400, detail="GitHub token not configured")
         
@@ -57,42 +75,162 @@ async def get_commits():
     }
     
     url = f"{BASE_URL}/repos/{GITHUB_REPO}/commits"
+    # GitHub returns at most 100 commits per page
+    limit = min(max(limit or GITHUB_COMMIT_LIMIT, 1), 100)
     
     try:
         async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    commits = await response.json()
-                    
-                    # Fetch detailed commit information including files
-                    detailed_commits = []
-                    for commit in commits[:10]:  # Limit to 10 commits for performance
-                        detailed_commit = await get_commit_details(session, headers, commit["sha"])
-                        detailed_commits.append(detailed_commit)
-                    
-                    return {
-                        "success": True,
-                        "commits": detailed_commits,
-                        "total": len(detailed_commits)
-                    }
-                else:
-                    raise HTTPException(status_code=response.status, detail="GitHub API error")
+            if since or last_sha:
+                commits = await fetch_commits_since_watermark(session, url, headers, since, last_sha)
+                commits = commits_after_watermark(commits, last_sha, limit)
+            else:
+                status, commits = await cached_get(session, url, headers, params={"per_page": limit})
+                if status != 200:
+                    raise HTTPException(status_code=status, detail="GitHub API error")
+                commits = commits[:limit]
+            
+            # Fetch detailed commit information including files, concurrently
+            semaphore = asyncio.Semaphore(max(GITHUB_DETAIL_CONCURRENCY, 1))
+            
+            async def fetch_details(commit_sha: str) -> Dict[str, Any]:
+                async with semaphore:
+                    return await get_commit_details(session, headers, commit_sha)
+            
+            detailed_commits = await asyncio.gather(
+                *(fetch_details(commit["sha"]) for commit in commits)
+            )
+            
+            return {
+                "success": True,
+                "commits": list(detailed_commits),
+                "total": len(detailed_commits)
+            }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching commits: {str(e)}")
 
+async def fetch_commits_since_watermark(session, url: str, headers: Dict[str, str],
+                                       since: Optional[str], last_sha: Optional[str]) -> List[Dict[str, Any]]:
+    """List commits newest first, following Link ``next`` pages until the watermark is reached"""
+    params = {"per_page": 100}
+    if since:
+        params["since"] = since
+    
+    commits = []
+    for _ in range(max(GITHUB_MAX_PAGES, 1)):
+        status, page, next_url = await cached_get_page(session, url, headers, params=params)
+        if status != 200:
+            raise HTTPException(status_code=status, detail="GitHub API error")
+        commits.extend(page)
+        if not next_url or (last_sha and any(commit.get("sha") == last_sha for commit in page)):
+            return commits
+        url, params = next_url, None
+    
+    print(f"Watermark not reached after {GITHUB_MAX_PAGES} pages, older new commits are not fetched")
+    return commits
+
+def commits_after_watermark(commits: List[Dict[str, Any]], last_sha: Optional[str], limit: int) -> List[Dict[str, Any]]:
+    """Keep commits newer than last_sha, the oldest ``limit`` of them.
+    
+    GitHub lists newest first; taking the oldest new commits lets the
+    watermark advance without skipping any when more than ``limit`` arrived.
+    """
+    new_commits = []
+    for commit in commits:
+        if last_sha and commit.get("sha") == last_sha:
+            break
+        new_commits.append(commit)
+    return new_commits[-limit:]
+
 async def get_commit_details(session, headers, commit_sha: str) -> Dict[str, Any]:
     """Get detailed commit information including files"""
     try:
+        # Commits are immutable, so a full SHA is served from disk once cached
+        cached = read_cached_commit(commit_sha)
+        if cached is not None:
+            return cached
+        
         url = f"{BASE_URL}/repos/{GITHUB_REPO}/commits/{commit_sha}"
-        async with session.get(url, headers=headers) as response:
-            if response.status == 200:
-                commit_data = await response.json()
-                return commit_data
-            else:
-                return {"sha": commit_sha, "error": "Failed to fetch details"}
+        status, commit_data = await cached_get(session, url, headers)
+        if status == 200:
+            write_cached_commit(commit_sha, commit_data)
+            return commit_data
+        else:
+            return {"sha": commit_sha, "error": "Failed to fetch details"}
     except Exception as e:
         return {"sha": commit_sha, "error": str(e)}
 
+async def cached_get(session, url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None):
+    """GET a GitHub URL with ETag / Last-Modified revalidation.
+    
+    Returns (status, body). A 304 is reported as 200 with the cached body.
+    """
+    status, body, _ = await cached_get_page(session, url, headers, params=params)
+    return status, body
+
+async def cached_get_page(session, url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None):
+    """Like cached_get, also returning the Link ``next`` URL (or None)"""
+    key = url
+    if params:
+        key = f"{url}?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+    
+    request_headers = dict(headers)
+    entry = response_cache.get(key)
+    if entry:
+        if entry.get("etag"):
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+    
+    async with session.get(url, headers=request_headers, params=params) as response:
+        if response.status == 304 and entry:
+            response_cache.move_to_end(key)
+            return 200, entry["body"], entry.get("next_url")
+        if response.status != 200:
+            return response.status, None, None
+        
+        body = await response.json()
+        next_link = response.links.get("next")
+        next_url = str(next_link["url"]) if next_link else None
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            response_cache[key] = {"etag": etag, "last_modified": last_modified, "body": body, "next_url": next_url}
+            response_cache.move_to_end(key)
+            while len(response_cache) > GITHUB_CACHE_MAX_ENTRIES:
+                response_cache.popitem(last=False)
+        return 200, body, next_url
+
+def cached_commit_path(commit_sha: str) -> str:
+    """Disk location of a cached commit detail payload"""
+    return os.path.join(GITHUB_CACHE_DIR, "commits", f"{commit_sha}.json")
+
+def read_cached_commit(commit_sha: str) -> Optional[Dict[str, Any]]:
+    """Read an immutable commit detail payload from the disk cache"""
+    if not FULL_SHA_PATTERN.match(commit_sha):
+        return None
+    try:
+        with open(cached_commit_path(commit_sha), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Error reading cached commit {commit_sha[:8]}: {e}")
+        return None
+
+def write_cached_commit(commit_sha: str, commit_data: Dict[str, Any]):
+    """Persist an immutable commit detail payload to the disk cache"""
+    if not FULL_SHA_PATTERN.match(commit_sha):
+        return
+    try:
+        path = cached_commit_path(commit_sha)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(commit_data, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error caching commit {commit_sha[:8]}: {e}")
+
 @app.post("/fetch-commits")
 async def fetch_commits(background_tasks: BackgroundTasks):
     """Fetch commits and send to AI service for processing"""
@@ -146,15 +284,14 @@ async def get_repository_info():
     
     try:
         async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    repo_info = await response.json()
-                    return {
-                        "success": True,
-                        "repository": repo_info
-                    }
-                else:
-                    raise HTTPException(status_code=response.status, detail="GitHub API error")
+            status, repo_info = await cached_get(session, url, headers)
+            if status == 200:
+                return {
+                    "success": True,
+                    "repository": repo_info
+                }
+            else:
+                raise HTTPException(status_code=status, detail="GitHub API error")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import axios from 'axios';
 import './App.css';
 
@@ -7,6 +7,9 @@ const API_BASE_URL = process.env.NODE_ENV === 'production'
   ? '/api'  // Use relative path in production (nginx proxy)
   : 'http://localhost:8000';  // Use localhost in development
 
+// How often the UI checks on a running ingestion job
+const JOB_POLL_INTERVAL_MS = 1000;
+
 function App() {
   const [loading, setLoading] = useState(false);
   const [commits, setCommits] = useState([]);
@@ -15,7 +18,40 @@ function App() {
   const [showJson, setShowJson] = useState(false);
   const [error, setError] = useState('');
   const [dataSource, setDataSource] = useState('');
+  // Delta-sync position: only commits changed after it are requested
+  const changesCursor = useRef(null);
+
+  // Changes arrive oldest first; show the newest first, replacing any stale copies
+  const mergeCommits = (incoming) => {
+    if (incoming.length === 0) return;
+    const incomingKeys = new Set(incoming.map((commit) => commit.hash_key));
+    setCommits((previous) => [
+      ...[...incoming].reverse(),
+      ...previous.filter((commit) => !incomingKeys.has(commit.hash_key))
+    ]);
+  };
 
+  const syncChanges = async () => {
+    if (!changesCursor.current) return;
+    try {
+      let hasMore = true;
+      while (hasMore) {
+        const response = await axios.get(`${API_BASE_URL}/commits/changes`, {
+          params: { since: changesCursor.current }
+        });
+        const data = response.data;
+        mergeCommits(data.commits || []);
+        changesCursor.current = data.cursor;
+        hasMore = data.has_more;
+      }
+    } catch (err) {
+      // A cursor the server no longer accepts forces a full reload on the next fetch
+      if (err.response && err.response.status === 400) {
+        changesCursor.current = null;
+      }
+      console.error('Error syncing changes:', err);
+    }
+  };
 
 
   const trackNow = async () => {
@@ -23,11 +59,13 @@ function App() {
     setError('');
     
     try {
-      const response = await axios.get(`${API_BASE_URL}/track-now`);
+      // Show stored data right away; the refresh job pushes new commits over /events
+      const response = await axios.get(`${API_BASE_URL}/track-now`, { params: { wait: false } });
       const data = response.data;
       
       if (data.success) {
         setCommits(data.commits);
+        changesCursor.current = data.changes_cursor || null;
         setJsonData(data.json_data);
         setStats({
           totalCommits: data.total_commits
@@ -44,11 +82,29 @@ function App() {
     }
   };
 
+  // Poll an ingestion job until it is no longer running
+  const waitForJob = async (jobId) => {
+    for (;;) {
+      const response = await axios.get(`${API_BASE_URL}/jobs/${jobId}`);
+      const job = response.data.job;
+      if (job.status !== 'running') return job;
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    }
+  };
+
   const fetchCommits = async () => {
     try {
-      const response = await axios.post(`${API_BASE_URL}/fetch-commits`);
-      if (response.data.success) {
-        // Refresh data after fetching new commits
+      // /fetch-commits only queues a fetch; the ingest job stores the commits, so sync after it finishes
+      const response = await axios.post(`${API_BASE_URL}/ingest`);
+      const job = await waitForJob(response.data.job_id);
+      if (job.status !== 'succeeded') {
+        setError(`Error fetching commits: ${job.error || job.status}`);
+        return;
+      }
+      // Pull only what changed since the last load
+      if (changesCursor.current) {
+        await syncChanges();
+      } else {
         await trackNow();
       }
     } catch (err) {
@@ -58,9 +114,29 @@ function App() {
   };
 
   useEffect(() => {
-    // Auto-refresh every 30 seconds
-    const interval = setInterval(trackNow, 30000);
-    return () => clearInterval(interval);
+    // Load current data once, then receive new commits over Server-Sent Events
+    trackNow();
+    const events = new EventSource(`${API_BASE_URL}/events`);
+    
+    events.addEventListener('commits', (event) => {
+      const data = JSON.parse(event.data);
+      // Event payloads are newest first; mergeCommits expects oldest first
+      mergeCommits([...(data.commits || [])].reverse());
+      if (data.total_commits !== undefined) {
+        setStats({ totalCommits: data.total_commits });
+      }
+      setDataSource('live_stream');
+    });
+    
+    // Catch up on anything missed while the stream was disconnected
+    events.onopen = () => syncChanges();
+    
+    events.onerror = (err) => {
+      // EventSource reconnects automatically
+      console.error('Event stream error:', err);
+    };
+    
+    return () => events.close();
   }, []);
 
   const formatDateTime = (dateString) => {
@@ -89,6 +165,12 @@ function App() {
     }
   };
 
+  const formatBytes = (bytes) => {
+    if (bytes < 1024) return `${bytes} B`;
+    if (bytes < 1024 * 1024) return `${(bytes / 1024).toFixed(1)} KB`;
+    return `${(bytes / (1024 * 1024)).toFixed(1)} MB`;
+  };
+
   const getSentimentColor = (sentiment) => {
     switch (sentiment) {
       case 'positive': return '#4CAF50';
@@ -255,6 +337,16 @@ function App() {
                                 +{file.additions || 0} -{file.deletions || 0}
                               </span>
                             )}
+                            {file.patch_size > 0 && (
+                              <a
+                                className="patch-size"
+                                href={`${API_BASE_URL}/commits/${commit.id}/files/${file.id}/patch`}
+                                target="_blank"
+                                rel="noopener noreferrer"
+                              >
+                                {formatBytes(file.patch_size)} patch
+                              </a>
+                            )}
                           </div>
                         ))}
                         {commit.files.length > 5 && (
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark the lexicon sentiment engine against TextBlob.
+
+Usage: python tests/benchmark_sentiment.py [corpus] [--repeat N]
+The corpus is a commit.json export or a text file with one message per line
+(defaults to data/commit.json plus the test corpus).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from textblob import TextBlob
+from ai_service.main import SentimentLexicon, get_sentiment_label
+from test_ai_service import SENTIMENT_CORPUS
+
+
+def load_corpus(path):
+    """Load commit messages from a commit.json export or a text file"""
+    if not path:
+        messages = list(SENTIMENT_CORPUS)
+        default_file = os.path.join(os.path.dirname(__file__), "..", "data", "commit.json")
+        if os.path.exists(default_file):
+            messages += load_corpus(default_file)
+        return messages
+    
+    with open(path) as f:
+        if path.endswith(".json"):
+            return [commit["message"] for commit in json.load(f).get("commits", [])]
+        return [line.strip() for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("corpus", nargs="?", help="commit.json export or text file of messages")
+    parser.add_argument("--repeat", type=int, default=200, help="times to repeat the corpus")
+    args = parser.parse_args()
+    
+    messages = load_corpus(args.corpus) * args.repeat
+    lexicon = SentimentLexicon()
+    
+    start = time.perf_counter()
+    textblob_scores = [TextBlob(message).sentiment.polarity for message in messages]
+    textblob_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    lexicon_scores = lexicon.score_batch(messages)
+    lexicon_seconds = time.perf_counter() - start
+    
+    agreement = sum(
+        get_sentiment_label(a) == get_sentiment_label(float(b))
+        for a, b in zip(textblob_scores, lexicon_scores)
+    ) / len(messages)
+    
+    print(f"Messages:        {len(messages)}")
+    print(f"TextBlob:        {textblob_seconds:.3f}s")
+    print(f"Lexicon:         {lexicon_seconds:.3f}s")
+    print(f"Speedup:         {textblob_seconds / lexicon_seconds:.1f}x")
+    print(f"Label agreement: {agreement:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,62 @@
+import ast
+import asyncio
+import json
+import os
+import sqlite3
+import uuid
+from urllib.parse import urlsplit, urlunsplit
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
-from ai_service.main import app
+from textblob import TextBlob
+import ai_service.main as ai_main
+from ai_service.main import app, AnalysisCache, CategoryModel, CATEGORY_NAMES, SentimentLexicon, get_sentiment_label
+from ai_service.train_category_model import fetch_labeled_commits, train_category_model, save_category_model
 
 client = TestClient(app)
 
+SENTIMENT_CORPUS = [
+    "fix: resolve login validation bug",
+    "feat: add user authentication system",
+    "docs: update README with installation guide",
+    "Merge pull request #42 from feature/search",
+    "Update README.md",
+    "refactor: clean up terrible legacy parser",
+    "fix: critical security vulnerability in auth",
+    "perf: much faster startup, really great improvement",
+    "revert broken build, not good",
+    "Fix very bad memory leak in worker pool",
+    "Remove unused imports",
+    "Add awesome new dashboard charts",
+    "hotfix: crash when config is missing",
+    "Improve error messages for invalid input",
+    "wip: ugly hack, will clean up later",
+    "chore: bump dependencies",
+    "fix: never retry on fatal errors",
+    "Make tests less flaky and slow",
+    "feat!: drop support for old API",
+    "Nice cleanup of the happy path",
+    "this isn't good",
+    "fix: login isn't working great",
+    "won't fix: terrible workaround",
+    "Don't break the good path",
+    "can't be better, really!",
+    "It's a great fix!",
+    "very good!!!",
+    "really not good",
+    "really not very good",
+    "fix: use has_more flag",
+    "make it not_good",
+    "rename happy_path to main_path",
+    "**Happy** path",
+    "docs: fix *bad* example in `README.md`",
+    "set debug=true and retries=3",
+    "perf: great speedup (see #42)...",
+    "Fixed the U.S. date format, e.g. in reports.",
+    "nice work :)",
+    "sure, this is fine (!)",
+]
+
 
 class TestAIService:
     """Test cases for AI Service"""
@@ -86,6 +139,170 @@ class TestAIService:
         analysis = data["analysis"]
         assert "documentation" in analysis["categories"]
 
+    
+    def test_analyze_batch_endpoint(self):
+        """Test batch analysis matches single analysis and keeps input order"""
+        messages = ["fix: critical security vulnerability", "docs: update README", "feat: add user authentication"]
+        response = client.post("/analyze-batch", json={"messages": messages})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert data["total"] == len(messages)
+        for message, analysis in zip(messages, data["analyses"]):
+            single = client.post("/analyze", json={"message": message}).json()["analysis"]
+            assert analysis["categories"] == single["categories"]
+            assert analysis["priority"] == single["priority"]
+            assert analysis["confidence_score"] == single["confidence_score"]
+    
+    def test_cache_stats_counts_repeated_messages(self):
+        """Test repeated messages are served from the analysis cache"""
+        before = client.get("/cache-stats").json()["cache"]
+        client.post("/analyze", json={"message": "Update README.md for cache test"})
+        client.post("/analyze", json={"message": "  Update README.md for cache test\n"})
+        response = client.get("/cache-stats")
+        assert response.status_code == 200
+        cache = response.json()["cache"]
+        assert cache["misses"] == before["misses"] + 1
+        assert cache["hits"] == before["hits"] + 1
+    
+    def test_analysis_cache_disk_tier_round_trip(self, tmp_path, monkeypatch):
+        """Test batched cache writes land on disk and batched reads find them there"""
+        path = str(tmp_path / "analyses.db")
+        analyses = {f"message {i}": {"sentiment_score": i / 1000} for i in range(1200)}
+        asyncio.run(AnalysisCache(10, path).put_many(analyses))
+        
+        cache = AnalysisCache(10, path)
+        statements = []
+        conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        conn.set_trace_callback(statements.append)
+        monkeypatch.setattr(cache, "_connection", lambda: conn)
+        found = asyncio.run(cache.get_many(list(analyses) + ["uncached message"]))
+        
+        assert found == {**analyses, "uncached message": None}
+        assert (cache.disk_hits, cache.misses, len(cache.entries)) == (1200, 1, 10)
+        assert len(statements) == 3  # one query per DISK_LOOKUP_BATCH keys
+    
+    def test_lexicon_sentiment_matches_textblob_labels(self):
+        """Test the lexicon sentiment engine agrees with TextBlob on sentiment labels"""
+        messages = list(SENTIMENT_CORPUS)
+        commit_file = os.path.join(os.path.dirname(__file__), "..", "data", "commit.json")
+        if os.path.exists(commit_file):
+            with open(commit_file) as f:
+                messages += [commit["message"] for commit in json.load(f).get("commits", [])]
+        
+        scores = SentimentLexicon().score_batch(messages)
+        agreement = sum(
+            get_sentiment_label(float(score)) == get_sentiment_label(TextBlob(message).sentiment.polarity)
+            for message, score in zip(messages, scores)
+        ) / len(messages)
+        assert agreement >= 0.95
+    
+    def test_lexicon_sentiment_matches_textblob_on_corpus(self):
+        """Test the lexicon sentiment engine gives TextBlob's polarity, contractions included"""
+        scores = SentimentLexicon().score_batch(SENTIMENT_CORPUS)
+        for message, score in zip(SENTIMENT_CORPUS, scores):
+            assert score == pytest.approx(TextBlob(message).sentiment.polarity), message
+    
+    @pytest.mark.parametrize("class_name, copy_path", [
+        ("KeywordMatcher", "app/utils/keyword_matcher.py"),
+        ("SentimentLexicon", "app/utils/sentiment_lexicon.py"),
+    ])
+    def test_ai_agent_copies_match_ai_service(self, class_name, copy_path):
+        """Test the classes copied into the ai-agent image are identical to ai-service's"""
+        root = os.path.join(os.path.dirname(__file__), "..")
+        
+        def class_source(path):
+            with open(path) as f:
+                source = f.read()
+            node = next(
+                node for node in ast.parse(source).body
+                if isinstance(node, ast.ClassDef) and node.name == class_name
+            )
+            return ast.get_source_segment(source, node)
+        
+        assert class_source(os.path.join(root, "ai-agent-service", copy_path)) == class_source(
+            os.path.join(root, "ai-service", "main.py")
+        )
+    
+    def test_category_model_probabilities(self, tmp_path):
+        """Test a trained category model returns per-category probabilities"""
+        messages = ["fix login bug", "add search feature", "update README docs", "fix auth password leak"] * 5
+        labels = [["bug_fix"], ["feature"], ["documentation"], ["bug_fix", "security"]] * 5
+        path = str(tmp_path / "category_model.joblib")
+        save_category_model(train_category_model(messages, labels), path)
+        
+        probabilities = CategoryModel(path).predict_proba(["fix crash bug", "add new feature"])
+        assert probabilities.shape == (2, len(CATEGORY_NAMES))
+        assert ((probabilities >= 0) & (probabilities <= 1)).all()
+        assert probabilities[0, CATEGORY_NAMES.index("bug_fix")] > 0.5
+        assert probabilities[1, CATEGORY_NAMES.index("feature")] > 0.5
+        assert probabilities[:, CATEGORY_NAMES.index("performance")].max() < 0.01
+    
+    def test_category_model_confidence_ignores_untrained_categories(self, tmp_path, monkeypatch):
+        """Test model confidence averages only over the categories the model was trained on"""
+        messages = ["fix login bug", "add search feature"] * 5
+        labels = [["bug_fix"], ["feature"]] * 5
+        path = str(tmp_path / "category_model.joblib")
+        save_category_model(train_category_model(messages, labels), path)
+        model = CategoryModel(path)
+        monkeypatch.setattr(ai_main, "CATEGORY_MODEL", model)
+        
+        _, probabilities, confidences = ai_main.model_categories(["fix search bug"])
+        
+        trained = [CATEGORY_NAMES.index("bug_fix"), CATEGORY_NAMES.index("feature")]
+        assert model.trained.sum() == 2
+        expected = np.maximum(probabilities[0, trained], 1 - probabilities[0, trained]).mean()
+        assert confidences[0] == pytest.approx(expected, abs=1e-3)
+        assert confidences[0] < 0.9
+
+
+
+# Postgres server for schema-level tests, e.g. postgresql://postgres@localhost/postgres
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+INIT_SQL_PATH = os.path.join(os.path.dirname(__file__), "..", "database", "init.sql")
+
+
+async def load_training_rows_from_stored_commits():
+    """Store analyzed commits through the database service and read them back for training"""
+    import asyncpg
+    import database_service.main as database_main
+    
+    database_name = f"test_labels_{uuid.uuid4().hex[:12]}"
+    admin = await asyncpg.connect(TEST_DATABASE_URL)
+    await admin.execute(f"CREATE DATABASE {database_name}")
+    try:
+        database_url = urlunsplit(urlsplit(TEST_DATABASE_URL)._replace(path=f"/{database_name}"))
+        with open(INIT_SQL_PATH) as f:
+            init_sql = f.read()
+        conn = await asyncpg.connect(database_url)
+        try:
+            await conn.execute(init_sql[init_sql.index("CREATE SCHEMA"):])
+            database_main.db_pool = await asyncpg.create_pool(database_url, min_size=1, max_size=2)
+            try:
+                await database_main.bulk_store_commits([
+                    {"commit_sha": "a1", "message": "fix login bug", "committed_at": "2025-08-01T10:00:00Z",
+                     "ai_analysis": {"categories": ["bug_fix"], "confidence_score": 0.9}},
+                    {"commit_sha": "b2", "message": "add search feature", "committed_at": "2025-08-02T10:00:00Z",
+                     "ai_analysis": {"categories": ["feature"], "confidence_score": 0.8}},
+                    {"commit_sha": "c3", "message": "unanalyzed commit", "committed_at": "2025-08-03T10:00:00Z"},
+                ])
+            finally:
+                await database_main.db_pool.close()
+                database_main.db_pool = None
+            return await fetch_labeled_commits(conn)
+        finally:
+            await conn.close()
+    finally:
+        await admin.execute(f"DROP DATABASE IF EXISTS {database_name}")
+        await admin.close()
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+def test_training_labels_come_from_stored_analyses():
+    """Test the trainer reads categories written by the database service"""
+    labeled = asyncio.run(load_training_rows_from_stored_commits())
+    assert sorted(labeled) == [("add search feature", ["feature"]), ("fix login bug", ["bug_fix"])]
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
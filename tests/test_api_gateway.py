@@ -1,6 +1,11 @@
+import asyncio
+import json
+import time
+import httpx
 import pytest
 from fastapi.testclient import TestClient
-from api_gateway_service.main import app
+import api_gateway_service.main as gateway_main
+from api_gateway_service.main import app, get_upstream_client
 
 
 client = TestClient(app)
@@ -33,6 +38,55 @@ class TestAPIGateway:
         # Should return 500 if database service is not running
         assert response.status_code in [200, 500]
     
+    def test_ingest_job_reports_progress(self):
+        """Test ingest returns a job id immediately and the job reports its stages"""
+        with TestClient(app) as job_client:
+            response = job_client.post("/ingest")
+            assert response.status_code == 202
+            job_id = response.json()["job_id"]
+            
+            deadline = time.monotonic() + 30
+            while True:
+                job_response = job_client.get(f"/jobs/{job_id}")
+                assert job_response.status_code == 200
+                job = job_response.json()["job"]
+                if job["status"] != "running" or time.monotonic() > deadline:
+                    break
+                time.sleep(0.1)
+            
+            # Upstream services may not be running, so the job may fail at its first stage
+            assert job["status"] in ["succeeded", "failed"]
+            assert "fetch" in job["stages"]
+            assert job["finished_at"] is not None
+            assert job_client.get("/jobs/unknown").status_code == 404
+    
+    def test_ingest_job_fails_when_store_fails(self, monkeypatch):
+        """Test a database error while storing marks the store stage and the job failed"""
+        def upstream(request):
+            if request.url.path == "/commits":
+                return httpx.Response(200, json={"success": True, "commits": [
+                    {"sha": "abc123", "commit": {"message": "fix bug"}}
+                ]})
+            if request.url.path == "/analyze-batch":
+                return httpx.Response(200, json={"analyses": [{"priority": "low"}]})
+            if request.url.path == "/store-commits":
+                return httpx.Response(500, text="database unavailable")
+            return httpx.Response(404)
+        
+        clients = {name: httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+                   for name in gateway_main.UPSTREAM_TIMEOUTS}
+        monkeypatch.setattr(gateway_main, "upstream_clients", clients)
+        job = gateway_main.create_ingest_job()
+        
+        with pytest.raises(Exception):
+            asyncio.run(gateway_main.run_track_now_pipeline(job))
+        
+        assert job["status"] == "failed"
+        assert job["stage"] == "store"
+        assert job["stages"]["store"]["status"] == "failed"
+        assert "500" in job["error"]
+        assert job["stored"] == 0
+    
     def test_get_commits_endpoint(self):
         """Test commits endpoint"""
         response = client.get("/commits")
@@ -77,6 +131,137 @@ class TestAPIGateway:
         # Should return 500 if GitHub Analysis service is not running
         assert response.status_code in [200, 500]
 
+    
+    def test_upstream_clients_are_shared(self):
+        """Test that upstream HTTP clients are reused across calls"""
+        assert get_upstream_client("database") is get_upstream_client("database")
+        assert get_upstream_client("ai") is not get_upstream_client("database")
+    
+    def test_patch_proxy_streams_ranges(self, monkeypatch):
+        """Test the patch proxy passes Range through and streams the partial body back"""
+        def upstream(request):
+            assert request.headers["range"] == "bytes=0-3"
+            return httpx.Response(206, content=b"@@ -", headers={
+                "content-type": "text/plain; charset=utf-8",
+                "accept-ranges": "bytes",
+                "content-range": "bytes 0-3/20",
+            })
+        
+        monkeypatch.setattr(gateway_main, "upstream_clients", {
+            "database": httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+        })
+        response = client.get("/commits/1/files/2/patch", headers={"Range": "bytes=0-3"})
+        
+        assert (response.status_code, response.content) == (206, b"@@ -")
+        assert response.headers["content-range"] == "bytes 0-3/20"
+
+
+
+def mock_upstreams(monkeypatch, handler):
+    """Route every upstream client through an in-process handler"""
+    clients = {name: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+               for name in gateway_main.UPSTREAM_TIMEOUTS}
+    monkeypatch.setattr(gateway_main, "upstream_clients", clients)
+
+
+class TestPipelineConcurrency:
+    """Single-flight /track-now, bounded AI fan-out and /events publishing"""
+    
+    @pytest.fixture(autouse=True)
+    def fresh_pipeline_state(self, monkeypatch):
+        monkeypatch.setattr(gateway_main, "track_now_task", None)
+        monkeypatch.setattr(gateway_main, "track_now_job", None)
+        monkeypatch.setattr(gateway_main, "track_now_result", None)
+        monkeypatch.setattr(gateway_main, "track_now_completed_at", 0.0)
+        monkeypatch.setattr(gateway_main, "event_subscribers", set())
+    
+    @staticmethod
+    def pipeline_upstream(calls):
+        """Upstream services for one pipeline run over a single commit"""
+        async def upstream(request):
+            calls.append(request.url.path)
+            if request.url.path == "/commits":
+                await asyncio.sleep(0.05)
+                return httpx.Response(200, json={"success": True, "commits": [
+                    {"sha": "abc123", "commit": {"message": "fix bug"}}
+                ]})
+            if request.url.path == "/analyze-batch":
+                return httpx.Response(200, json={"analyses": [{"priority": "high"}]})
+            if request.url.path == "/store-commits":
+                return httpx.Response(200, json={"success": True, "inserted": 1, "updated": 0, "skipped": 0})
+            if request.url.path == "/track-now":
+                return httpx.Response(200, json={"success": True, "total_commits": 1, "commits": [
+                    {"commit_sha": "abc123", "message": "fix bug"}
+                ]})
+            return httpx.Response(404)
+        return upstream
+    
+    def test_concurrent_track_now_runs_pipeline_once(self, monkeypatch):
+        """Test concurrent /track-now callers share one pipeline run, and fresh results are reused"""
+        calls = []
+        mock_upstreams(monkeypatch, self.pipeline_upstream(calls))
+        
+        async def run():
+            results = await asyncio.gather(*(gateway_main.track_now() for _ in range(5)))
+            again = await gateway_main.track_now()
+            return results, again
+        
+        results, again = asyncio.run(run())
+        
+        assert calls.count("/commits") == 1
+        assert calls.count("/store-commits") == 1
+        assert all(result == results[0] for result in results)
+        assert again == results[0]
+    
+    def test_slow_commit_times_out_without_failing_batch(self, monkeypatch):
+        """Test per-commit analysis is bounded in concurrency and a slow commit only loses its own analysis"""
+        monkeypatch.setattr(gateway_main, "AI_ANALYSIS_CONCURRENCY", 2)
+        monkeypatch.setattr(gateway_main, "AI_ANALYSIS_TIMEOUT", 0.2)
+        in_flight = []
+        peak = []
+        
+        async def upstream(request):
+            message = json.loads(request.content)["message"]
+            in_flight.append(message)
+            peak.append(len(in_flight))
+            try:
+                await asyncio.sleep(5 if message == "slow" else 0.01)
+                return httpx.Response(200, json={"success": True, "analysis": {"message": message}})
+            finally:
+                in_flight.remove(message)
+        
+        mock_upstreams(monkeypatch, upstream)
+        commits = [{"sha": str(i), "commit": {"message": message}}
+                   for i, message in enumerate(["one", "slow", "two", "three", "four"])]
+        
+        started = time.monotonic()
+        asyncio.run(gateway_main.analyze_commits_concurrently(commits))
+        
+        assert time.monotonic() - started < 2
+        assert max(peak) <= 2
+        assert commits[1]["ai_analysis"] == {}
+        assert [commit["ai_analysis"] for commit in commits if commit["sha"] != "1"] == [
+            {"message": "one"}, {"message": "two"}, {"message": "three"}, {"message": "four"}
+        ]
+    
+    def test_store_publishes_commits_event(self, monkeypatch):
+        """Test a pipeline run that stores commits pushes them to /events subscribers"""
+        mock_upstreams(monkeypatch, self.pipeline_upstream([]))
+        
+        async def run():
+            queue = asyncio.Queue()
+            gateway_main.event_subscribers.add(queue)
+            await gateway_main.run_track_now_pipeline(gateway_main.create_ingest_job())
+            return queue
+        
+        queue = asyncio.run(run())
+        
+        assert queue.qsize() == 1
+        event, data = queue.get_nowait().strip().split("\n")
+        assert event == "event: commits"
+        payload = json.loads(data[len("data: "):])
+        assert payload == {"commits": [{"commit_sha": "abc123", "message": "fix bug"}], "total_commits": 1}
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
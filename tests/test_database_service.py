@@ -1,5 +1,11 @@
+import asyncio
+import os
+import uuid
+from urllib.parse import urlsplit, urlunsplit
 import pytest
+from datetime import datetime
 from fastapi.testclient import TestClient
+import database_service.main as database_main
 from database_service.main import app
 
 client = TestClient(app)
@@ -38,6 +44,89 @@ class TestDatabaseService:
         # Should return 500 if database is not connected
         assert response.status_code in [200, 500]
     
+    def test_commits_cursor_round_trip(self):
+        """Test pagination cursors are opaque and decode to the (created_at, id) position"""
+        created_at = database_main.datetime(2024, 5, 1, 12, 30, 15, 123456)
+        cursor = database_main.encode_cursor(created_at, 42)
+        assert database_main.decode_cursor(cursor) == (created_at, 42)
+    
+    def test_commits_invalid_cursor(self):
+        """Test a malformed cursor is rejected"""
+        response = client.get("/commits", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+    
+    def test_commits_rejects_zero_limit(self):
+        """Test commits validates limit instead of failing with a 500"""
+        response = client.get("/commits", params={"limit": 0})
+        assert response.status_code == 422
+    
+    def test_commit_changes_invalid_cursor(self):
+        """Test delta sync rejects a malformed cursor"""
+        assert database_main.decode_changes_cursor(database_main.encode_changes_cursor((912, 7))) == (912, 7)
+        response = client.get("/commits/changes", params={"since": "not-a-cursor"})
+        assert response.status_code == 400
+    
+    def test_commit_changes_rejects_zero_limit(self):
+        """Test delta sync validates limit instead of failing with a 500"""
+        response = client.get("/commits/changes", params={"limit": 0})
+        assert response.status_code == 422
+    
+    def test_parse_byte_range(self):
+        """Test patch byte ranges are parsed like HTTP Range headers"""
+        assert database_main.parse_byte_range(None, 100) is None
+        assert database_main.parse_byte_range("bytes=0-9", 100) == (0, 9)
+        assert database_main.parse_byte_range("bytes=90-", 100) == (90, 99)
+        assert database_main.parse_byte_range("bytes=-10", 100) == (90, 99)
+        assert database_main.parse_byte_range("bytes=50-500", 100) == (50, 99)
+        assert database_main.parse_byte_range("bytes=100-", 100) is False
+        # An invalid range is ignored rather than refused
+        assert database_main.parse_byte_range("bytes=5-3", 100) is None
+    
+    def test_stream_patch_decompresses_only_the_range(self):
+        """Test streamed patch ranges match slices of the decompressed patch, across chunk boundaries"""
+        patch = "".join(f"+line {i}\n" for i in range(30000)).encode()
+        compressed = database_main.zlib.compress(patch)
+        chunk = database_main.PATCH_STREAM_CHUNK_SIZE
+        for start, end in [(0, len(patch) - 1), (0, 9), (chunk - 5, chunk + 5), (len(patch) - 10, len(patch) - 1)]:
+            streamed = b"".join(database_main.stream_patch(None, compressed, "zlib", start, end))
+            assert streamed == patch[start:end + 1]
+        assert len(list(database_main.stream_patch(None, compressed, "zlib", 0, 9))) == 1
+        assert b"".join(database_main.stream_patch("legacy inline", None, None, 7, 12)) == b"inline"
+    
+    def test_patch_endpoint_streams_ranges(self, monkeypatch):
+        """Test the patch endpoint streams full bodies, ranges, and ignores invalid ranges"""
+        patch = b"@@ -1 +1 @@\n-old\n+new\n"
+        
+        class PatchConnection:
+            async def fetchrow(self, query, *args):
+                return {"patch": None, "data": database_main.zlib.compress(patch),
+                        "compression": "zlib", "size": len(patch)}
+        
+        monkeypatch.setattr(database_main, "db_pool", CountingPool(PatchConnection()))
+        url = "/commits/1/files/2/patch"
+        
+        response = client.get(url)
+        assert (response.status_code, response.content) == (200, patch)
+        assert response.headers["content-length"] == str(len(patch))
+        
+        response = client.get(url, headers={"Range": "bytes=0-5"})
+        assert (response.status_code, response.content) == (206, patch[:6])
+        assert response.headers["content-range"] == f"bytes 0-5/{len(patch)}"
+        
+        response = client.get(url, headers={"Range": "bytes=5-3"})
+        assert (response.status_code, response.content) == (200, patch)
+        
+        response = client.get(url, headers={"Range": f"bytes={len(patch)}-"})
+        assert response.status_code == 416
+    
+    def test_patch_blobs_round_trip(self):
+        """Test patches are content addressed and decompressed on read"""
+        patch = database_main.patch_bytes("@@ -1 +1 @@\n-old\n+new\n")
+        assert database_main.patch_hash(patch) == database_main.patch_hash(database_main.patch_bytes(patch.decode()))
+        compressed = database_main.zlib.compress(patch)
+        assert database_main.read_patch(None, compressed, "zlib") == patch
+        assert database_main.read_patch("legacy inline", None, None) == b"legacy inline"
+    
     def test_store_commits_endpoint(self):
         """Test store commits endpoint"""
         commits_data = {
@@ -64,6 +153,163 @@ class TestDatabaseService:
         response = client.get("/stats")
         # Should return 500 if database is not connected
         assert response.status_code in [200, 500]
+    
+    def test_rebuild_stats_endpoint(self):
+        """Test stats rebuild endpoint"""
+        response = client.post("/admin/rebuild-stats")
+        # Should return 500 if database is not connected
+        assert response.status_code in [200, 500]
+
+
+
+class CountingConnection:
+    """Fake asyncpg connection that counts queries and fabricates rows"""
+    
+    def __init__(self):
+        self.queries = 0
+    
+    async def fetch(self, query, *args):
+        self.queries += 1
+        if "FROM track_project.commits" in query:
+            return [{"id": i, "created_at": None} for i in range(args[0])]
+        if "FROM track_project.ai_analysis" in query:
+            return [{"commit_id": i, "results": '{"priority": "high"}'} for i in args[0]]
+        if "FROM track_project.commit_files" in query:
+            return [{"commit_id": i, "file_path": f"file_{i}.py"} for i in args[0]]
+        return []
+
+
+class CountingPool:
+    """Fake pool handing out a single counting connection"""
+    
+    def __init__(self, conn):
+        self.conn = conn
+    
+    def acquire(self):
+        pool = self
+        
+        class _Acquire:
+            async def __aenter__(self):
+                return pool.conn
+            
+            async def __aexit__(self, *exc):
+                return False
+        
+        return _Acquire()
+
+
+class TestLatestCommitsQueryCount:
+    """Benchmark: query count for get_latest_commits must not grow with limit"""
+    
+    @pytest.mark.parametrize("limit", [1, 50, 500, 5000])
+    def test_query_count_is_constant(self, monkeypatch, limit):
+        conn = CountingConnection()
+        monkeypatch.setattr(database_main, "db_pool", CountingPool(conn))
+        
+        commits = asyncio.run(database_main.get_latest_commits(limit=limit))
+        
+        assert len(commits) == limit
+        assert commits[-1]["ai_analysis"] == {"priority": "high"}
+        assert commits[-1]["files"] == [{"file_path": f"file_{limit - 1}.py"}]
+        assert conn.queries == 3
+
+
+
+class RepoStatsConnection:
+    """Fake asyncpg connection serving a repo_stats rollup"""
+    
+    def __init__(self):
+        self.queries = []
+    
+    async def fetch(self, query, *args):
+        self.queries.append(query)
+        return [
+            {"repository": "", "total_commits": 2, "ai_processed_commits": 0,
+             "first_commit_at": None, "last_commit_at": None},
+            {"repository": "owner/repo", "total_commits": 5, "ai_processed_commits": 4,
+             "first_commit_at": datetime(2025, 8, 1), "last_commit_at": datetime(2025, 8, 15)},
+        ]
+    
+    async def fetchval(self, query, *args):
+        self.queries.append(query)
+        return None
+
+
+class TestStatisticsRollup:
+    """Statistics come from repo_stats instead of scanning commits"""
+    
+    def test_statistics_sum_repo_stats(self, monkeypatch):
+        conn = RepoStatsConnection()
+        monkeypatch.setattr(database_main, "db_pool", CountingPool(conn))
+        
+        stats = asyncio.run(database_main.get_statistics())
+        
+        assert stats["total_commits"] == 7
+        assert stats["ai_processed"] == 4
+        assert stats["repositories"] == [None, "owner/repo"]
+        assert stats["repository_stats"][1]["last_commit_at"] == "2025-08-15T00:00:00"
+        assert not any("FROM track_project.commits" in query for query in conn.queries)
+
+
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+INIT_SQL_PATH = os.path.join(os.path.dirname(__file__), "..", "database", "init.sql")
+
+
+async def store_counts_for_batches(batches):
+    """Store each batch through bulk_store_commits in a scratch database and return the counts"""
+    import asyncpg
+    
+    database_name = f"test_store_{uuid.uuid4().hex[:12]}"
+    admin = await asyncpg.connect(TEST_DATABASE_URL)
+    await admin.execute(f"CREATE DATABASE {database_name}")
+    try:
+        database_url = urlunsplit(urlsplit(TEST_DATABASE_URL)._replace(path=f"/{database_name}"))
+        with open(INIT_SQL_PATH) as f:
+            init_sql = f.read()
+        conn = await asyncpg.connect(database_url)
+        try:
+            await conn.execute(init_sql[init_sql.index("CREATE SCHEMA"):])
+        finally:
+            await conn.close()
+        database_main.db_pool = await asyncpg.create_pool(database_url, min_size=1, max_size=2)
+        try:
+            return [await database_main.bulk_store_commits(batch) for batch in batches]
+        finally:
+            await database_main.db_pool.close()
+            database_main.db_pool = None
+    finally:
+        await admin.execute(f"DROP DATABASE IF EXISTS {database_name}")
+        await admin.close()
+
+
+def analyzed_commit(sha, categories, processed_at):
+    """Commit payload as the AI service returns it"""
+    return {
+        "commit_sha": sha,
+        "message": f"commit {sha}",
+        "committed_at": "2025-08-01T10:00:00Z",
+        "ai_analysis": {"categories": categories, "processed_at": processed_at},
+    }
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+def test_store_counts_only_written_commits():
+    """Test re-storing unchanged commits reports them skipped, not updated"""
+    first = [analyzed_commit("a1", ["bug_fix"], "2025-08-01T10:00:00"),
+             analyzed_commit("b2", ["feature"], "2025-08-01T10:00:00")]
+    identical = [analyzed_commit("a1", ["bug_fix"], "2025-08-02T10:00:00"),
+                 analyzed_commit("b2", ["feature"], "2025-08-02T10:00:00")]
+    reanalyzed = [analyzed_commit("a1", ["bug_fix", "security"], "2025-08-03T10:00:00"),
+                  analyzed_commit("b2", ["feature"], "2025-08-03T10:00:00")]
+    
+    counts = asyncio.run(store_counts_for_batches([first, identical, reanalyzed]))
+    
+    assert counts == [
+        {"inserted": 2, "updated": 0, "skipped": 0},
+        {"inserted": 0, "updated": 0, "skipped": 2},
+        {"inserted": 0, "updated": 1, "skipped": 1},
+    ]
 
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
+import os
 import pytest
 from fastapi.testclient import TestClient
-from github_analysis_service.main import app
+from github_analysis_service.main import app, SQLiteDuplicateRegistry
 
 client = TestClient(app)
 
@@ -111,6 +112,33 @@ class TestGitHubAnalysisService:
         data2 = response2.json()
         assert data2["is_duplicate"] is True
 
+    
+    def test_hash_stats_reports_registry(self):
+        """Test hash stats report registry memory use and false-positive rate"""
+        response = client.get("/hash-stats")
+        assert response.status_code == 200
+        registry = response.json()["registry"]
+        assert "entries" in registry
+        assert "estimated_fp_rate" in registry
+        assert registry["estimated_fp_rate"] < 0.01
+    
+    def test_sqlite_registry_keeps_running_count(self, tmp_path):
+        """Test the SQLite registry counts entries without scanning and survives reopening"""
+        path = str(tmp_path / "registry.db")
+        registry = SQLiteDuplicateRegistry(path)
+        assert registry.add("a") and registry.add("b")
+        assert not registry.add("a")
+        assert len(registry) == 2
+        
+        reopened = SQLiteDuplicateRegistry(path)
+        assert len(reopened) == 2
+        assert reopened.stats()["disk_bytes"] >= os.path.getsize(path) + os.path.getsize(f"{path}-wal")
+        
+        reopened.clear()
+        assert len(registry) == 0
+        assert registry.add("a")
+        assert len(reopened) == 1
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -1,5 +1,7 @@
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
+import github_service.main as github_main
 from github_service.main import app
 
 client = TestClient(app)
@@ -44,5 +46,56 @@ class TestGitHubService:
         assert response.status_code in [200, 400, 500]
 
 
+
+class PagedResponse:
+    """Fake aiohttp response for one page of the commit list"""
+    
+    def __init__(self, body, next_url):
+        self.status = 200
+        self.headers = {}
+        self.body = body
+        self.links = {"next": {"url": next_url}} if next_url else {}
+    
+    async def json(self):
+        return self.body
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+
+
+class PagedSession:
+    """Fake aiohttp session serving newest-first commits 100 per page"""
+    
+    def __init__(self, shas):
+        self.pages = [shas[i:i + 100] for i in range(0, len(shas), 100)]
+        self.requests = 0
+    
+    def get(self, url, headers=None, params=None):
+        page = int(url.rsplit("page=", 1)[1]) if "page=" in url else 1
+        self.requests += 1
+        next_url = f"https://api.github.com/commits?page={page + 1}" if page < len(self.pages) else None
+        return PagedResponse([{"sha": sha} for sha in self.pages[page - 1]], next_url)
+
+
+class TestWatermarkPagination:
+    """New commits beyond the first page must not be skipped"""
+    
+    def test_follows_next_pages_to_watermark(self):
+        # 250 new commits newer than "old-0", newest first
+        shas = [f"new-{i}" for i in range(249, -1, -1)] + [f"old-{i}" for i in range(50)]
+        session = PagedSession(shas)
+        
+        commits = asyncio.run(github_main.fetch_commits_since_watermark(
+            session, "https://api.github.com/commits", {}, None, "old-0"
+        ))
+        selected = github_main.commits_after_watermark(commits, "old-0", 10)
+        
+        assert session.requests == 3
+        assert [commit["sha"] for commit in selected] == [f"new-{i}" for i in range(9, -1, -1)]
+
+
 if __name__ == "__main__":
     pytest.main([__file__])